@@ -3,20 +3,26 @@
 
 import os
 import shutil
-import subprocess
 
 # Configuration file for the Sphinx documentation builder.
 #
 # For the full list of built-in configuration values, see the documentation:
 # https://www.sphinx-doc.org/en/master/usage/configuration.html
-from datetime import datetime
+from datetime import datetime, timezone
+from pathlib import Path
 
 # -- Project information -----------------------------------------------------
 # https://www.sphinx-doc.org/en/master/usage/configuration.html#project-information
 
 project = 'idf-build-apps'
 project_homepage = 'https://github.com/espressif/idf-build-apps'
-copyright = f'2023-{datetime.now().year}, Espressif Systems (Shanghai) Co., Ltd.'  # noqa: A001
+# respect SOURCE_DATE_EPOCH for reproducible builds, in UTC to not depend on the timezone of the build machine
+_source_date_epoch = os.getenv('SOURCE_DATE_EPOCH')
+if _source_date_epoch:
+    _build_year = datetime.fromtimestamp(int(_source_date_epoch), tz=timezone.utc).year
+else:
+    _build_year = datetime.now(tz=timezone.utc).year
+copyright = f'2023-{_build_year}, Espressif Systems (Shanghai) Co., Ltd.'  # noqa: A001
 author = 'Fu Hanxi'
 languages = ['en']
 version = '2.x'
@@ -56,7 +62,30 @@ autodoc_default_options = {
 }
 
 
+# resolved once
+_DOCS_DIR = Path(__file__).resolve().parent
+_SRC_DIR = _DOCS_DIR.parent / 'idf_build_apps'
+_APIDOC_TEMPLATES_DIR = _DOCS_DIR / '_apidoc_templates'
+
+
+def _newest_mtime(path, pattern='*'):
+    return max((p.stat().st_mtime for p in path.rglob(pattern) if p.is_file()), default=0.0)
+
+
+def _env_bool(name):
+    return os.getenv(name, '').strip().lower() in ('1', 'true', 'yes', 'y', 'on')
+
+
+def _source_modules():
+    # removing a module changes no mtime of the remaining files, compare the module list as well
+    return '\n'.join(sorted(p.relative_to(_SRC_DIR).as_posix() for p in _SRC_DIR.rglob('*.py')))
+
+
 def generate_api_docs(language):
+    # skip the api docs for quick previews of the other pages
+    if _env_bool('IDF_BUILD_APPS_SKIP_APIDOC'):
+        return
+
     from idf_build_apps.args import (
         BuildArguments,
         FindArguments,
@@ -64,11 +93,6 @@ def generate_api_docs(language):
     )
     from idf_build_apps.main import build_apps, find_apps
 
-    docs_dir = os.path.dirname(__file__)
-    api_dir = os.path.join(docs_dir, language, 'references', 'api')
-    if os.path.isdir(api_dir):
-        shutil.rmtree(api_dir)
-
     # --- MOCK DOCSTRINGS By Arguments ---
     add_args_to_obj_doc_as_params(FindArguments)
     add_args_to_obj_doc_as_params(BuildArguments)
@@ -76,10 +100,28 @@ def generate_api_docs(language):
     add_args_to_obj_doc_as_params(BuildArguments, build_apps)
     # --- MOCK DOCSTRINGS FINISHED ---
 
-    subprocess.run(
+    api_dir = _DOCS_DIR / language / 'references' / 'api'
+    modules_file = api_dir / '.modules'
+    modules = _source_modules()
+    if api_dir.is_dir():
+        # skip regenerating the api docs if they're newer than all the sources and generated for the same modules,
+        # so that sphinx could reuse the cached doctrees of the unchanged files
+        if (
+            modules_file.is_file()
+            and modules_file.read_text() == modules
+            and _newest_mtime(api_dir) >= max(_newest_mtime(_SRC_DIR, '*.py'), _newest_mtime(_APIDOC_TEMPLATES_DIR))
+        ):
+            return
+
+        # remove the stale files of the deleted or renamed modules as well
+        shutil.rmtree(api_dir)
+
+    # run in-process, reusing the sphinx modules already imported by sphinx-build
+    from sphinx.ext.apidoc import main as apidoc_main
+
+    apidoc_main(
         [
-            'sphinx-apidoc',
-            os.path.join(docs_dir, '..', 'idf_build_apps'),
+            str(_SRC_DIR),
             '-f',
             '-H',
             'API Reference',
@@ -87,6 +129,7 @@ def generate_api_docs(language):
             '-t',
             '_apidoc_templates',
             '-o',
-            api_dir,
+            str(api_dir),
         ]
     )
+    modules_file.write_text(modules)
@@ -5,31 +5,68 @@
 Tools for building ESP-IDF related apps.
 """
 
-# ruff: noqa: E402
-# avoid circular imports
-
-__version__ = '2.6.1'
+import importlib
+import pkgutil
+import typing as t
 
 from .session_args import (
     SessionArgs,
 )
 
+__version__ = '2.6.1'
+
 SESSION_ARGS = SessionArgs()
 
-from .app import (
-    App,
-    AppDeserializer,
-    CMakeApp,
-    MakeApp,
-)
-from .log import (
-    setup_logging,
-)
-from .main import (
-    build_apps,
-    find_apps,
-    json_to_app,
-)
+if t.TYPE_CHECKING:
+    from .app import (
+        App,
+        AppDeserializer,
+        CMakeApp,
+        MakeApp,
+    )
+    from .log import (
+        setup_logging,
+    )
+    from .main import (
+        build_apps,
+        find_apps,
+        json_to_app,
+    )
+
+# public attrs are imported on first access, to avoid loading pydantic and the whole package
+# while importing `idf_build_apps` or any of its submodules
+_LAZY_ATTRS = {
+    'App': '.app',
+    'AppDeserializer': '.app',
+    'CMakeApp': '.app',
+    'MakeApp': '.app',
+    'build_apps': '.main',
+    'find_apps': '.main',
+    'json_to_app': '.main',
+    'setup_logging': '.log',
+}
+
+
+def __getattr__(name: str) -> t.Any:
+    if name in _LAZY_ATTRS:
+        value = getattr(importlib.import_module(_LAZY_ATTRS[name], __name__), name)
+    elif name in _submodules():
+        # `idf_build_apps.<submodule>` without importing the submodule explicitly
+        value = importlib.import_module(f'.{name}', __name__)
+    else:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    globals()[name] = value
+    return value
+
+
+def _submodules() -> t.List[str]:
+    return [m.name for m in pkgutil.iter_modules(__path__) if not m.name.startswith('_')]
+
+
+def __dir__() -> t.List[str]:
+    return sorted({*globals(), *_LAZY_ATTRS, *_submodules()})
+
 
 __all__ = [
     'App',
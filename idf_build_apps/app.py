@@ -10,7 +10,9 @@ import re
 import shutil
 import sys
 import typing as t
+from collections import deque
 from datetime import datetime, timezone
+from hashlib import sha256
 from pathlib import (
     Path,
 )
@@ -47,6 +49,7 @@ from .utils import (
     BaseModel,
     BuildError,
     Literal,
+    file_contains,
     files_matches_patterns,
     find_first_match,
     rmdir,
@@ -55,17 +58,132 @@ from .utils import (
     to_list,
 )
 
+LOGGER = logging.getLogger(__name__)
 
-class _AppBuildStageFilter(logging.Filter):
-    def __init__(self, *args, app, **kwargs):
-        super().__init__(*args, **kwargs)
+# default of App.LOG_ERROR_WARNING_REGEX
+_LOG_ERROR_WARNING_REGEX = re.compile(r'(?:error|warning):', re.MULTILINE | re.IGNORECASE)
+# group references, numbered, named, or in conditional groups
+_BACKREFERENCE_REGEX = re.compile(r'\\[1-9]|\(\?P=|\(\?\(')
+
+
+@functools.lru_cache(maxsize=None)
+def _combine_regexes(regexes: t.Tuple[t.Union[str, t.Pattern], ...]) -> t.Tuple[t.Pattern, ...]:
+    """
+    Combine the regexes into one alternation, so that a line is checked in a single search.
+
+    :param regexes: regexes, either compiled or not
+    :return: the combined regex, or the original regexes if they can't be combined safely,
+        i.e. with different flags, or with group references that would be renumbered
+    """
+    compiled = tuple(re.compile(regex) for regex in regexes)
+    if len(compiled) < 2 or len({regex.flags for regex in compiled}) > 1:
+        return compiled
+
+    if any(_BACKREFERENCE_REGEX.search(regex.pattern) for regex in compiled):
+        return compiled
+
+    try:
+        return (re.compile('|'.join(f'(?:{regex.pattern})' for regex in compiled), compiled[0].flags),)
+    except re.error:
+        return compiled
+
+
+# (build path, build path mtime) -> found .map file
+_MAP_FILES: t.Dict[t.Tuple[str, int], str] = {}
+
+
+def _find_map_file(build_path: str) -> t.Optional[str]:
+    """
+    Find the .map file under the build directory. Found ones are cached until the build directory changes.
+
+    :param build_path: build directory
+    :return: path of the .map file if found, else None
+    """
+    # mtime of the directory changes when files are added or removed, e.g. a rebuild
+    key = (build_path, os.stat(build_path).st_mtime_ns)
+    if key in _MAP_FILES:
+        return _MAP_FILES[key]
+
+    # the map file is generated right under the build directory, look there first
+    with os.scandir(build_path) as it:
+        map_file = next((entry.path for entry in it if entry.name.endswith('.map') and entry.is_file()), None)
+    if not map_file:
+        map_file = find_first_match('*.map', build_path)
+
+    if map_file:
+        _MAP_FILES[key] = map_file
+
+    return map_file
+
+
+@functools.lru_cache(maxsize=None)
+def _modified_non_md_fullpaths(modified_files: t.Tuple[str, ...], cwd: str) -> t.Tuple[str, ...]:  # noqa: ARG001
+    """
+    Absolute paths of the modified files except the markdown files, the same list is checked by every app
+
+    :param modified_files: modified files
+    :param cwd: current working directory, the relative paths are resolved against it
+    :return: absolute paths
+    """
+    fullpaths = (to_absolute_path(f) for f in modified_files)
+    return tuple(f for f in fullpaths if not os.path.basename(f).endswith('.md'))
+
+
+def _link_or_copy(src: str, dst: str) -> str:
+    """
+    Hard link the file, or copy it if it can't be linked, e.g. across file systems
+
+    :param src: source file
+    :param dst: destination file
+    :return: destination file
+    """
+    try:
+        os.link(src, dst)
+    except OSError:
+        return shutil.copy2(src, dst)
+
+    return dst
+
+
+def _parse_sdkconfig_line(line: str) -> t.Optional[t.Tuple[str, str]]:
+    """
+    Parse a `KEY=value` or `KEY="value"` line of the sdkconfig files.
+
+    Same as matching `App.SDKCONFIG_LINE_REGEX`, but with string operations only, run for every line of the files.
+
+    :param line: line
+    :return: key and value without the quotes, or None if not matched
+    """
+    key, sep, value = line.partition('=')
+    if not key or not sep:
+        return None
+
+    value = value.rstrip('\n')
+    if value.startswith('"'):
+        value = value[1:]
+    if value.endswith('"'):
+        value = value[:-1]
+    if '"' in value or '\n' in value:
+        return None
+
+    return key, value
+
+
+class _AppLoggerAdapter(logging.LoggerAdapter):
+    """
+    Add the build stage of the app to the records. All the apps share the module logger,
+    loggers created by `logging.getLogger` are never freed.
+    """
+
+    def __init__(self, logger: logging.Logger, app: 'App') -> None:
+        super().__init__(logger, {})
         self.app = app
 
-    def filter(self, record: logging.LogRecord) -> bool:
+    def process(self, msg: t.Any, kwargs: t.MutableMapping[str, t.Any]) -> t.Tuple[t.Any, t.MutableMapping[str, t.Any]]:
         if self.app._build_stage:
-            record.build_stage = self.app._build_stage.value
+            kwargs['extra'] = {**(kwargs.get('extra') or {}), 'build_stage': self.app._build_stage.value}
 
-        return True
+        return msg, kwargs
 
 
 class App(BaseModel):
@@ -75,15 +193,21 @@ class App(BaseModel):
     FULL_NAME_PLACEHOLDER: t.ClassVar[str] = '@f'  # replace it with escaped self.app_dir
     IDF_VERSION_PLACEHOLDER: t.ClassVar[str] = '@v'  # replace it with the IDF version
     INDEX_PLACEHOLDER: t.ClassVar[str] = '@i'  # replace it with the build index (while build_apps)
+    # all the placeholders above, substituted in one pass.
+    # the optional leading character is only removed together with the wildcard when there's no config name
+    _PLACEHOLDER_REGEX: t.ClassVar[t.Pattern] = re.compile(r'(.?)@([itvnfw])', re.DOTALL)
 
+    # not used while parsing the sdkconfig files anymore, see `_parse_sdkconfig_line`
     SDKCONFIG_LINE_REGEX: t.ClassVar[t.Pattern] = re.compile(r'^([^=]+)=\"?([^\"\n]*)\"?\n*$')
 
     # could be assigned later, used for filtering out apps by supported_targets
     MANIFEST: t.ClassVar[t.Optional[Manifest]] = None
     # This RE will match GCC errors and many other fatal build errors and warnings as well
-    LOG_ERROR_WARNING_REGEX: t.ClassVar[t.Pattern] = re.compile(r'(?:error|warning):', re.MULTILINE | re.IGNORECASE)
+    LOG_ERROR_WARNING_REGEX: t.ClassVar[t.Pattern] = _LOG_ERROR_WARNING_REGEX
     # Log this many trailing lines from a failed build log, also
     LOG_DEBUG_LINES: t.ClassVar[int] = 25
+    # written to the work directory, records the app files it was copied from. used with `reuse_work_dir`
+    WORK_DIR_SIGNATURE_FILENAME: t.ClassVar[str] = '.idf_build_apps.sig'
     # IGNORE_WARNING_REGEX is a regex for warnings to be ignored. Could be assigned later
     IGNORE_WARNS_REGEXES: t.ClassVar[t.List[t.Pattern]] = []
 
@@ -107,11 +231,16 @@ class App(BaseModel):
     _build_log_filename: t.Optional[str] = None
     _size_json_filename: t.Optional[str] = None
 
+    # placeholders substituted paths, environment variables are expanded on each access
+    _expand_cache: t.Dict[t.Tuple[t.Any, ...], str]
+
     dry_run: bool = False
     verbose: bool = False
     check_warnings: bool = False
     preserve: bool = True
     copy_sdkconfig: bool = False
+    reuse_work_dir: bool = False
+    hardlink_work_dir: bool = False
 
     # build_apps() related
     index: t.Optional[int] = None
@@ -147,6 +276,8 @@ class App(BaseModel):
         )
         super().__init__(**kwargs)
 
+        self._expand_cache = {}
+
         # These internal variables store the paths with environment variables and placeholders;
         # Public properties with similar names use the _expand method to get the actual paths.
         self._work_dir = work_dir or app_dir
@@ -171,11 +302,21 @@ class App(BaseModel):
         # private attrs, won't be dumped to json
         self._checked_should_build = False
 
-        self._logger = logging.getLogger(f'{__name__}.{hash(self)}')
-        self._logger.addFilter(_AppBuildStageFilter(app=self))
+        self._logger = _AppLoggerAdapter(LOGGER, app=self)
 
         self._sdkconfig_files, self._sdkconfig_files_defined_target = self._process_sdkconfig_files()
 
+    @classmethod
+    def set_ignore_warns_regexes(cls, regexes: t.Iterable[t.Union[str, t.Pattern]]) -> None:
+        """
+        Set the regexes of the warnings to be ignored, compiled once here instead of while checking the build logs
+
+        :param regexes: regexes, either compiled or not
+        """
+        cls.IGNORE_WARNS_REGEXES = [re.compile(regex) for regex in regexes]
+        # warm up the cache
+        _combine_regexes(tuple(cls.IGNORE_WARNS_REGEXES))
+
     @classmethod
     def from_another(cls, other: 'App', **kwargs) -> 'App':
         """Init New App from another, with different parameters.
@@ -222,8 +363,9 @@ class App(BaseModel):
         if self.sdkconfig_defaults_str is not None:
             return self.sdkconfig_defaults_str.split(';')
 
-        if os.getenv('SDKCONFIG_DEFAULTS', None) is not None:
-            return os.getenv('SDKCONFIG_DEFAULTS', '').split(';')
+        sdkconfig_defaults_env = os.getenv('SDKCONFIG_DEFAULTS')
+        if sdkconfig_defaults_env is not None:
+            return sdkconfig_defaults_env.split(';')
 
         return [DEFAULT_SDKCONFIG]
 
@@ -240,28 +382,53 @@ class App(BaseModel):
         if not path:
             return path
 
-        if self.index is not None:
-            path = path.replace(self.INDEX_PLACEHOLDER, str(self.index))
-        path = path.replace(
-            self.IDF_VERSION_PLACEHOLDER, f'{IDF_VERSION_MAJOR}_{IDF_VERSION_MINOR}_{IDF_VERSION_PATCH}'
-        )
-        path = path.replace(self.TARGET_PLACEHOLDER, self.target)
-        path = path.replace(self.NAME_PLACEHOLDER, self.name)
-        if self.FULL_NAME_PLACEHOLDER in path:  # to avoid recursion to the call to app_dir in the next line:
-            path = path.replace(self.FULL_NAME_PLACEHOLDER, self.app_dir.replace(os.path.sep, '_'))
-        wildcard_pos = path.find(self.WILDCARD_PLACEHOLDER)
-        if wildcard_pos != -1:
+        # most of the paths have neither placeholders nor environment variables, skip the scans for them
+        if '@' in path:
+            # the placeholders depend on these fields, which could be reassigned later, e.g. `index` in build_apps()
+            key = (path, self.index, self.target, self.config_name, self.app_dir)
+            expanded = self._expand_cache.get(key)
+            if expanded is None:
+                expanded = self._expand_cache[key] = self._substitute_placeholders(path)
+        else:
+            expanded = path
+
+        if '$' in expanded:
+            expanded = os.path.expandvars(expanded)
+
+        return expanded
+
+    def _substitute_placeholders(self, path: str) -> str:
+        wildcard_removed = False
+
+        def _repl(m: t.Match) -> str:
+            nonlocal wildcard_removed
+
+            placeholder = m.group(2)
+            if placeholder == 'i':
+                return m.group(1) + str(self.index) if self.index is not None else m.group(0)
+            if placeholder == 'v':
+                return m.group(1) + f'{IDF_VERSION_MAJOR}_{IDF_VERSION_MINOR}_{IDF_VERSION_PATCH}'
+            if placeholder == 't':
+                return m.group(1) + self.target
+            if placeholder == 'n':
+                return m.group(1) + self.name
+            if placeholder == 'f':
+                return m.group(1) + self.app_dir.replace(os.path.sep, '_')
+
+            # wildcard
             if self.config_name:
                 # if config name is defined, put it in place of the placeholder
-                path = path.replace(self.WILDCARD_PLACEHOLDER, self.config_name)
-            else:
-                # otherwise, remove the placeholder and one character on the left
-                # (which is usually an underscore, dash, or other delimiter)
-                left_of_wildcard = max(0, wildcard_pos - 1)
-                right_of_wildcard = wildcard_pos + len(self.WILDCARD_PLACEHOLDER)
-                path = path[0:left_of_wildcard] + path[right_of_wildcard:]
-        path = os.path.expandvars(path)
-        return path
+                return m.group(1) + self.config_name
+
+            if wildcard_removed:
+                return m.group(0)
+
+            # otherwise, remove the placeholder and one character on the left
+            # (which is usually an underscore, dash, or other delimiter)
+            wildcard_removed = True
+            return ''
+
+        return self._PLACEHOLDER_REGEX.sub(_repl, path)
 
     @property
     def name(self) -> str:
@@ -290,10 +457,11 @@ class App(BaseModel):
 
     @property
     def build_path(self) -> str:
-        if os.path.isabs(self.build_dir):
-            return self.build_dir
+        build_dir = self.build_dir
+        if os.path.isabs(build_dir):
+            return build_dir
 
-        return os.path.join(self.work_dir, self.build_dir)
+        return os.path.join(self.work_dir, build_dir)
 
     @computed_field  # type: ignore
     @property
@@ -302,8 +470,9 @@ class App(BaseModel):
 
     @property
     def build_log_path(self) -> str:
-        if self.build_log_filename:
-            return os.path.join(self.build_path, self.build_log_filename)
+        build_log_filename = self.build_log_filename
+        if build_log_filename:
+            return os.path.join(self.build_path, build_log_filename)
 
         # use a temp file if build log path is not specified
         return os.path.join(self.build_path, '.temp.build.log')
@@ -319,8 +488,9 @@ class App(BaseModel):
 
     @property
     def size_json_path(self) -> t.Optional[str]:
-        if self.size_json_filename:
-            return os.path.join(self.build_path, self.size_json_filename)
+        size_json_filename = self.size_json_filename
+        if size_json_filename:
+            return os.path.join(self.build_path, size_json_filename)
 
         return None
 
@@ -332,11 +502,11 @@ class App(BaseModel):
         sdkconfig_files_defined_target: t.Optional[str] = None
 
         # put the expanded variable files in a temporary directory
-        # will remove if the content is the same as the original one
+        # only if the content is different from the original one
         expanded_dir = os.path.join(self.work_dir, 'expanded_sdkconfig_files', os.path.basename(self.build_dir))
-        if not os.path.isdir(expanded_dir):
-            os.makedirs(expanded_dir)
 
+        processed_files: t.Set[str] = set()
+        # the same file may be listed both in the defaults and as the sdkconfig path
         for f in self.sdkconfig_defaults_candidates + ([self.sdkconfig_path] if self.sdkconfig_path else []):
             # use filepath if abs/rel already point to itself
             if not os.path.isfile(f):
@@ -347,61 +517,56 @@ class App(BaseModel):
                     self._logger.debug('sdkconfig file %s not found, skipping...', f)
                     continue
 
-            expanded_fp = os.path.join(expanded_dir, os.path.basename(f))
+            abs_f = os.path.abspath(f)
+            if abs_f in processed_files:
+                self._logger.debug('sdkconfig file %s already applied, skipping...', f)
+                continue
+            processed_files.add(abs_f)
+
+            expanded_lines: t.List[str] = []
+            # the files are small, read them at once instead of line by line
             with open(f) as fr:
-                with open(expanded_fp, 'w') as fw:
-                    for line in fr:
-                        line = os.path.expandvars(line)
+                content = fr.read()
 
-                        m = self.SDKCONFIG_LINE_REGEX.match(line)
-                        if m:
-                            key = m.group(1)
-                            if key == 'CONFIG_IDF_TARGET':
-                                sdkconfig_files_defined_target = m.group(2)
+            for line in content.splitlines(keepends=True):
+                # most of the lines have no variables at all
+                if '$' in line:
+                    line = os.path.expandvars(line)
 
-                            if isinstance(self, CMakeApp):
-                                if key in self.SDKCONFIG_TEST_OPTS:
-                                    self.cmake_vars[key] = m.group(2)
-                                    continue
+                kv = _parse_sdkconfig_line(line)
+                if kv:
+                    key, value = kv
+                    if key == 'CONFIG_IDF_TARGET':
+                        sdkconfig_files_defined_target = value
 
-                                if key in self.SDKCONFIG_IGNORE_OPTS:
-                                    continue
+                    if isinstance(self, CMakeApp):
+                        if key in self.SDKCONFIG_TEST_OPTS:
+                            self.cmake_vars[key] = value
+                            continue
 
-                        fw.write(line)
+                        if key in self.SDKCONFIG_IGNORE_OPTS:
+                            continue
 
-            with open(f) as fr:
-                with open(expanded_fp) as new_fr:
-                    if fr.read() == new_fr.read():
-                        self._logger.debug('Use sdkconfig file %s', f)
-                        try:
-                            os.unlink(expanded_fp)
-                        except OSError:
-                            self._logger.debug('Failed to remove file %s', expanded_fp)
-                        real_sdkconfig_files.append(f)
-                    else:
-                        self._logger.debug('Expand sdkconfig file %s to %s', f, expanded_fp)
-                        real_sdkconfig_files.append(expanded_fp)
-                        # copy the related target-specific sdkconfig files
-                        par_dir = os.path.abspath(os.path.join(f, '..'))
-                        for target_specific_file in (
-                            os.path.join(par_dir, str(p))
-                            for p in Path(par_dir).glob(os.path.basename(f) + f'.{self.target}')
-                        ):
-                            self._logger.debug(
-                                'Copy target-specific sdkconfig file %s to %s', target_specific_file, expanded_dir
-                            )
-                            shutil.copy(target_specific_file, expanded_dir)
-
-        # remove if expanded folder is empty
-        try:
-            os.rmdir(expanded_dir)
-        except OSError:
-            pass
+                expanded_lines.append(line)
 
-        try:
-            os.rmdir(os.path.join(self.work_dir, 'expanded_sdkconfig_files'))
-        except OSError:
-            pass
+            expanded_content = ''.join(expanded_lines)
+            if expanded_content == content:
+                self._logger.debug('Use sdkconfig file %s', f)
+                real_sdkconfig_files.append(f)
+                continue
+
+            expanded_fp = os.path.join(expanded_dir, os.path.basename(f))
+            self._logger.debug('Expand sdkconfig file %s to %s', f, expanded_fp)
+            os.makedirs(expanded_dir, exist_ok=True)
+            with open(expanded_fp, 'w') as fw:
+                fw.write(expanded_content)
+            real_sdkconfig_files.append(expanded_fp)
+
+            # copy the related target-specific sdkconfig file
+            target_specific_file = f'{abs_f}.{self.target}'
+            if os.path.isfile(target_specific_file):
+                self._logger.debug('Copy target-specific sdkconfig file %s to %s', target_specific_file, expanded_dir)
+                shutil.copy(target_specific_file, expanded_dir)
 
         if SESSION_ARGS.override_sdkconfig_file_path:
             real_sdkconfig_files.append(SESSION_ARGS.override_sdkconfig_file_path)
@@ -477,52 +642,91 @@ class App(BaseModel):
         if self.build_status == BuildStatus.SKIPPED:
             return
 
-        if self.work_dir != self.app_dir:
-            if os.path.exists(self.work_dir):
-                self._logger.debug('Removed existing work dir: %s', self.work_dir)
-                if not self.dry_run:
-                    shutil.rmtree(self.work_dir)
-
-            self._logger.debug('Copied app from %s to %s', self.app_dir, self.work_dir)
-            if not self.dry_run:
-                # if the new directory inside the original directory,
-                # make sure not to go into recursion.
-                ignore = shutil.ignore_patterns(
-                    os.path.basename(self.work_dir),
-                    # also ignore files which may be present in the work directory
-                    'build',
-                    'sdkconfig',
-                )
+        # the paths are expanded on each access, resolve them once here
+        work_dir = self.work_dir
+        build_path = self.build_path
+        build_log_path = self.build_log_path
+
+        if work_dir != self.app_dir:
+            # if the new directory inside the original directory,
+            # make sure not to go into recursion.
+            ignore = shutil.ignore_patterns(
+                os.path.basename(work_dir),
+                # also ignore files which may be present in the work directory
+                'build',
+                'sdkconfig',
+            )
+            signature = self._app_dir_signature(ignore) if self.reuse_work_dir else None
+            signature_file = os.path.join(work_dir, self.WORK_DIR_SIGNATURE_FILENAME)
 
-                shutil.copytree(self.app_dir, self.work_dir, ignore=ignore, symlinks=True)
+            if signature and os.path.isfile(signature_file) and Path(signature_file).read_text() == signature:
+                self._logger.debug('Reused work dir %s, app files in %s are not changed', work_dir, self.app_dir)
+            else:
+                if os.path.exists(work_dir):
+                    self._logger.debug('Removed existing work dir: %s', work_dir)
+                    if not self.dry_run:
+                        shutil.rmtree(work_dir)
 
-        if os.path.exists(self.build_path):
-            self._logger.debug('Removed existing build dir: %s', self.build_path)
+                self._logger.debug('Copied app from %s to %s', self.app_dir, work_dir)
+                if not self.dry_run:
+                    shutil.copytree(
+                        self.app_dir,
+                        work_dir,
+                        ignore=ignore,
+                        symlinks=True,
+                        copy_function=_link_or_copy if self.hardlink_work_dir else shutil.copy2,
+                    )
+                    if signature:
+                        Path(signature_file).write_text(signature)
+
+        if os.path.exists(build_path):
+            self._logger.debug('Removed existing build dir: %s', build_path)
             if not self.dry_run:
-                shutil.rmtree(self.build_path)
+                shutil.rmtree(build_path)
 
         if not self.dry_run:
-            os.makedirs(self.build_path, exist_ok=True)
+            os.makedirs(build_path, exist_ok=True)
 
-        sdkconfig_file = os.path.join(self.work_dir, 'sdkconfig')
+        sdkconfig_file = os.path.join(work_dir, 'sdkconfig')
         if os.path.exists(sdkconfig_file):
             self._logger.debug('Removed existing sdkconfig file: %s', sdkconfig_file)
             if not self.dry_run:
                 os.unlink(sdkconfig_file)
 
-        if os.path.isfile(self.build_log_path):
-            self._logger.debug('Removed existing build log file: %s', self.build_log_path)
+        if os.path.isfile(build_log_path):
+            self._logger.debug('Removed existing build log file: %s', build_log_path)
             if not self.dry_run:
-                os.unlink(self.build_log_path)
+                os.unlink(build_log_path)
         elif not self.dry_run:
-            os.makedirs(os.path.dirname(self.build_log_path), exist_ok=True)
-        self._logger.info('Writing build log to %s', self.build_log_path)
+            os.makedirs(os.path.dirname(build_log_path), exist_ok=True)
+        self._logger.info('Writing build log to %s', build_log_path)
 
         if self.dry_run:
             self.build_status = BuildStatus.SKIPPED
             self.build_comment = 'dry run'
             return
 
+    def _app_dir_signature(self, ignore: t.Callable[[str, t.List[str]], t.Set[str]]) -> str:
+        """
+        Signature of the files that would be copied to the work directory, made of their paths, sizes and mtimes
+
+        :param ignore: same as the `ignore` of `shutil.copytree`
+        :return: hex digest
+        """
+        h = sha256()
+        for root, dirs, files in os.walk(self.app_dir):
+            ignored = ignore(root, dirs + files)
+            dirs[:] = sorted(d for d in dirs if d not in ignored)
+            for f in sorted(files):
+                if f in ignored:
+                    continue
+
+                fp = os.path.join(root, f)
+                st = os.lstat(fp)
+                h.update(f'{os.path.relpath(fp, self.app_dir)}:{st.st_size}:{st.st_mtime_ns}\n'.encode())
+
+        return h.hexdigest()
+
     @record_build_duration  # type: ignore
     def build(
         self,
@@ -590,11 +794,16 @@ class App(BaseModel):
             self._logger.warning(f'{self.build_log_path} does not exist. Skipping post build actions...')
             return
 
-        # check warnings
+        # check warnings in one pass, only keep the last few lines for the failed builds
         has_unignored_warning = False
-        with open(self.build_log_path) as fr:
-            lines = [line.rstrip() for line in fr if line.rstrip()]
-            for line in lines:
+        last_lines: t.Deque[str] = deque(maxlen=self.LOG_DEBUG_LINES)
+        with open(self.build_log_path, encoding='utf-8', errors='replace') as fr:
+            for line in fr:
+                line = line.rstrip()
+                if not line:
+                    continue
+
+                last_lines.append(line)
                 is_error_or_warning, ignored = self.is_error_or_warning(line)
                 if is_error_or_warning:
                     if ignored:
@@ -611,7 +820,7 @@ class App(BaseModel):
                 self.LOG_DEBUG_LINES,
                 self.build_log_path,
             )
-            for line in lines[-self.LOG_DEBUG_LINES :]:
+            for line in last_lines:
                 self._logger.error('%s', line)
         # correct build status for originally successful builds
         elif self.build_status == BuildStatus.SUCCESS:
@@ -628,23 +837,27 @@ class App(BaseModel):
         if self.build_status != BuildStatus.SUCCESS:
             return
 
+        build_log_path = self.build_log_path
+
         # remove temp log file
         if self._is_build_log_path_temp:
-            os.unlink(self.build_log_path)
-            self._logger.debug('Removed success build temporary log file: %s', self.build_log_path)
+            os.unlink(build_log_path)
+            self._logger.debug('Removed success build temporary log file: %s', build_log_path)
 
         # Cleanup build directory if not preserving
         if not self.preserve:
             exclude_list = []
-            if self.size_json_path:
-                exclude_list.append(os.path.basename(self.size_json_path))
-            exclude_list.append(os.path.basename(self.build_log_path))
+            size_json_path = self.size_json_path
+            if size_json_path:
+                exclude_list.append(os.path.basename(size_json_path))
+            exclude_list.append(os.path.basename(build_log_path))
 
+            build_path = self.build_path
             rmdir(
-                self.build_path,
+                build_path,
                 exclude_file_patterns=exclude_list,
             )
-            self._logger.debug('Removed built binaries under: %s', self.build_path)
+            self._logger.debug('Removed built binaries under: %s', build_path)
 
     def _build(
         self,
@@ -660,7 +873,7 @@ class App(BaseModel):
         if not self.size_json_path:
             return
 
-        map_file = find_first_match('*.map', self.build_path)
+        map_file = _find_map_file(self.build_path)
         if not map_file:
             self._logger.warning(
                 '.map file not found. Cannot write size json to file: %s',
@@ -715,31 +928,34 @@ class App(BaseModel):
         return self.model_dump_json()
 
     def is_error_or_warning(self, line: str) -> t.Tuple[bool, bool]:
-        if not self.LOG_ERROR_WARNING_REGEX.search(line):
+        # most of the lines have neither, check the literals before running the case-insensitive regex.
+        # only for ascii lines, some non-ascii characters are matched case-insensitively to ascii letters
+        log_error_warning_regex = self.LOG_ERROR_WARNING_REGEX
+        if log_error_warning_regex is _LOG_ERROR_WARNING_REGEX and line.isascii():
+            lower_line = line.lower()
+            if 'error:' not in lower_line and 'warning:' not in lower_line:
+                return False, False
+
+        if not log_error_warning_regex.search(line):
             return False, False
 
-        is_ignored = False
-        for ignored in self.IGNORE_WARNS_REGEXES:
-            if re.search(ignored, line):
-                is_ignored = True
-                break
+        if not self.IGNORE_WARNS_REGEXES:
+            return True, False
 
-        return True, is_ignored
+        return True, any(regex.search(line) for regex in _combine_regexes(tuple(self.IGNORE_WARNS_REGEXES)))
 
     @classmethod
     def is_app(cls, path: str) -> bool:
         raise NotImplementedError('Please implement this function in sub classes')
 
     def is_modified(self, modified_files: t.Optional[t.List[str]]) -> bool:
-        _app_dir_fullpath = to_absolute_path(self.app_dir)
-        if modified_files:
-            for f in modified_files:
-                _f_fullpath = to_absolute_path(f)
-                if os.path.basename(_f_fullpath).endswith('.md'):
-                    continue
+        if not modified_files:
+            return False
 
-                if _f_fullpath.startswith(_app_dir_fullpath):
-                    return True
+        _app_dir_fullpath = to_absolute_path(self.app_dir)
+        for _f_fullpath in _modified_non_md_fullpaths(tuple(modified_files), os.getcwd()):
+            if _f_fullpath.startswith(_app_dir_fullpath):
+                return True
 
         return False
 
@@ -776,15 +992,19 @@ class App(BaseModel):
             self._checked_should_build = True
             return
 
+        # both are looked up from the manifest on each access
+        depends_components = self.depends_components
+        depends_filepatterns = self.depends_filepatterns
+
         # if didn't modify any components, and no `depends_filepatterns` defined, skip
-        if modified_components == [] and not self.depends_filepatterns:
+        if modified_components == [] and not depends_filepatterns:
             self.build_status = BuildStatus.SKIPPED
             self.build_comment = 'current build does not modify any components'
             self._checked_should_build = True
             return
 
         # if no special rules defined, we left it unknown and decide with idf.py reconfigure
-        if not self.depends_components and not self.depends_filepatterns:
+        if not depends_components and not depends_filepatterns:
             # keep unknown
             self._checked_should_build = True
             self.build_comment = 'no special rules defined, run idf.py reconfigure to decide'
@@ -795,23 +1015,23 @@ class App(BaseModel):
         modified_files = to_list(modified_files)
 
         # depends components?
-        if self.depends_components and modified_components is not None:
-            if set(self.depends_components).intersection(set(modified_components)):
+        if depends_components and modified_components is not None:
+            if set(depends_components).intersection(set(modified_components)):
                 self._checked_should_build = True
                 self.build_status = BuildStatus.SHOULD_BE_BUILT
                 self.build_comment = (
-                    f'Requires components: {", ".join(self.depends_components)}. '
+                    f'Requires components: {", ".join(depends_components)}. '
                     f'Modified components: {", ".join(modified_components)}'
                 )
                 return
 
         # or depends file patterns?
-        if self.depends_filepatterns and modified_files is not None:
-            if files_matches_patterns(modified_files, self.depends_filepatterns, manifest_rootpath):
+        if depends_filepatterns and modified_files is not None:
+            if files_matches_patterns(modified_files, depends_filepatterns, manifest_rootpath):
                 self._checked_should_build = True
                 self.build_status = BuildStatus.SHOULD_BE_BUILT
                 self.build_comment = (
-                    f'Requires file patterns: {", ".join(self.depends_filepatterns)}. '
+                    f'Requires file patterns: {", ".join(depends_filepatterns)}. '
                     f'Modified files: {", ".join(modified_files)}'
                 )
                 return
@@ -867,43 +1087,37 @@ class MakeApp(App):
             ['make', f'-j{os.cpu_count() or 1}'],
         ]
 
-        for cmd in commands:
-            subprocess_run(
-                cmd,
-                log_terminal=self._is_build_log_path_temp,
-                log_fs=self.build_log_path,
-                check=True,
-                additional_env_dict=additional_env_dict,
-                cwd=self.work_dir,
-            )
+        # open the build log once for all the commands
+        with open(self.build_log_path, 'a') as fa:
+            for cmd in commands:
+                subprocess_run(
+                    cmd,
+                    log_terminal=self._is_build_log_path_temp,
+                    log_fs=fa,
+                    check=True,
+                    additional_env_dict=additional_env_dict,
+                    cwd=self.work_dir,
+                )
 
         self.build_status = BuildStatus.SUCCESS
 
     @classmethod
     def is_app(cls, path: str) -> bool:
-        makefile_path = os.path.join(path, 'Makefile')
-        if not os.path.exists(makefile_path):
-            return False
-
-        with open(makefile_path) as makefile:
-            makefile_content = makefile.read()
-
-        if cls.MAKE_PROJECT_LINE not in makefile_content:
-            return False
-
-        return True
+        return file_contains(os.path.join(path, 'Makefile'), cls.MAKE_PROJECT_LINE.encode())
 
 
 class CMakeApp(App):
     # If these keys are present in sdkconfig.defaults, they will be extracted and passed to CMake
-    SDKCONFIG_TEST_OPTS: t.ClassVar[t.List[str]] = [
-        'EXCLUDE_COMPONENTS',
-        'TEST_EXCLUDE_COMPONENTS',
-        'TEST_COMPONENTS',
-    ]
+    SDKCONFIG_TEST_OPTS: t.ClassVar[t.FrozenSet[str]] = frozenset(
+        [
+            'EXCLUDE_COMPONENTS',
+            'TEST_EXCLUDE_COMPONENTS',
+            'TEST_COMPONENTS',
+        ]
+    )
 
     # These keys in sdkconfig.defaults are not propagated to the final sdkconfig file:
-    SDKCONFIG_IGNORE_OPTS: t.ClassVar[t.List[str]] = ['TEST_GROUPS']
+    SDKCONFIG_IGNORE_OPTS: t.ClassVar[t.FrozenSet[str]] = frozenset(['TEST_GROUPS'])
 
     # While ESP-IDF component CMakeLists files can be identified by the presence of 'idf_component_register' string,
     # there is no equivalent for the project CMakeLists files. This seems to be the best option...
@@ -944,6 +1158,7 @@ class CMakeApp(App):
 
         # check if this app depends on components according to the project_description.json 'build_component' field.
         # the file is generated by `idf.py reconfigure`.
+        sdkconfig_files = self.sdkconfig_files
         common_args = [
             sys.executable,
             str(IDF_PY),
@@ -953,7 +1168,7 @@ class CMakeApp(App):
             self.work_dir,
             f'-DIDF_TARGET={self.target}',
             # set to ";" to disable `default` when no such variable
-            '-DSDKCONFIG_DEFAULTS={}'.format(';'.join(self.sdkconfig_files) if self.sdkconfig_files else ';'),
+            '-DSDKCONFIG_DEFAULTS={}'.format(';'.join(sdkconfig_files) if sdkconfig_files else ';'),
         ]
 
         if self.build_status == BuildStatus.UNKNOWN and modified_components is not None and check_app_dependencies:
@@ -1005,20 +1220,7 @@ class CMakeApp(App):
 
     @classmethod
     def is_app(cls, path: str) -> bool:
-        cmakelists_path = os.path.join(path, 'CMakeLists.txt')
-        if not os.path.exists(cmakelists_path):
-            return False
-
-        with open(cmakelists_path) as fr:
-            cmakelists_file_content = fr.read()
-
-        if not cmakelists_file_content:
-            return False
-
-        if cls.CMAKE_PROJECT_LINE not in cmakelists_file_content:
-            return False
-
-        return True
+        return file_contains(os.path.join(path, 'CMakeLists.txt'), cls.CMAKE_PROJECT_LINE.encode())
 
 
 class AppDeserializer(BaseModel):
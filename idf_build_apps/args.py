@@ -3,11 +3,11 @@
 
 import argparse
 import enum
+import functools
 import glob
 import inspect
 import logging
 import os
-import re
 import sys
 import typing as t
 from copy import deepcopy
@@ -27,7 +27,7 @@ from pydantic_settings import (
 from typing_extensions import Concatenate, ParamSpec
 
 from . import SESSION_ARGS, App, setup_logging
-from .constants import ALL_TARGETS, IDF_BUILD_APPS_TOML_FN
+from .constants import ALL_TARGETS, ALL_TARGETS_SET, IDF_BUILD_APPS_TOML_FN
 from .manifest.manifest import FolderRule, Manifest
 from .utils import InvalidCommand, files_matches_patterns, semicolon_separated_str_to_list, to_absolute_path, to_list
 from .vendors.pydantic_sources import PyprojectTomlConfigSettingsSource, TomlConfigSettingsSource
@@ -302,6 +302,27 @@ class DependencyDrivenBuildArguments(GlobalArguments):
         default=None,  # type: ignore
     )
 
+    # memoized below, reset when any of these fields is reassigned
+    _MEMOIZED_FROM_FIELDS: t.ClassVar[t.FrozenSet[str]] = frozenset(
+        {
+            'manifest_rootpath',
+            'modified_components',
+            'modified_files',
+            'deactivate_dependency_driven_build_by_components',
+            'deactivate_dependency_driven_build_by_filepatterns',
+            'compare_manifest_sha_filepath',
+        }
+    )
+    _dependency_driven_build_enabled: t.Optional[bool] = None
+    _modified_manifest_rules_folders: t.Optional[t.Set[str]] = None
+
+    def __setattr__(self, name: str, value: t.Any) -> None:
+        super().__setattr__(name, value)
+
+        if name in self._MEMOIZED_FROM_FIELDS:
+            self._dependency_driven_build_enabled = None
+            self._modified_manifest_rules_folders = None
+
     def model_post_init(self, __context: Any) -> None:
         super().model_post_init(__context)
 
@@ -343,6 +364,13 @@ class DependencyDrivenBuildArguments(GlobalArguments):
 
         :return: True if enabled, False otherwise
         """
+        # checked for each app, while the result is the same for all of them
+        if self._dependency_driven_build_enabled is None:
+            self._dependency_driven_build_enabled = self._check_dependency_driven_build_enabled()
+
+        return self._dependency_driven_build_enabled
+
+    def _check_dependency_driven_build_enabled(self) -> bool:
         # not check since modified_components and modified_files are not passed
         if self.modified_components is None and self.modified_files is None:
             return False
@@ -380,7 +408,13 @@ class DependencyDrivenBuildArguments(GlobalArguments):
     @property
     def modified_manifest_rules_folders(self) -> t.Optional[t.Set[str]]:
         if self.compare_manifest_sha_filepath and App.MANIFEST is not None:
-            return App.MANIFEST.diff_sha_with_filepath(self.compare_manifest_sha_filepath, use_abspath=True)
+            # diff once, instead of reading the sha file again for each app
+            if self._modified_manifest_rules_folders is None:
+                self._modified_manifest_rules_folders = App.MANIFEST.diff_sha_with_filepath(
+                    self.compare_manifest_sha_filepath, use_abspath=True
+                )
+
+            return self._modified_manifest_rules_folders
 
         return None
 
@@ -546,16 +580,17 @@ class FindBuildArguments(DependencyDrivenBuildArguments):
             self.target = 'all'
 
         if self.default_build_targets:
-            default_build_targets = []
+            # dict keeps the order while removing the duplicates
+            default_build_targets: t.Dict[str, None] = {}
             for target in self.default_build_targets:
-                if target not in ALL_TARGETS:
+                if target not in ALL_TARGETS_SET:
                     LOGGER.warning(
                         f'Ignoring... Unrecognizable target {target} specified with "--default-build-targets". '
                         f'Current ESP-IDF available targets: {ALL_TARGETS}'
                     )
-                elif target not in default_build_targets:
-                    default_build_targets.append(target)
-            self.default_build_targets = default_build_targets
+                else:
+                    default_build_targets[target] = None
+            self.default_build_targets = list(default_build_targets)
             LOGGER.info('Overriding default build targets to %s', self.default_build_targets)
             FolderRule.DEFAULT_BUILD_TARGETS = self.default_build_targets
         elif self.enable_preview_targets:
@@ -625,6 +660,16 @@ class BuildArguments(FindBuildArguments):
         'and the current run will build the parallel_index-th part',
         default=1,  # type: ignore
     )
+    jobs: int = field(
+        FieldMetadata(
+            type=int,
+            shorthand='-j',
+        ),
+        description='Number of apps to build in parallel in the current run. '
+        'Apps sharing the work directory or the build directory are rejected when building in parallel. '
+        'Set --build-log-filename to keep the build outputs apart',
+        default=1,  # type: ignore
+    )
     dry_run: bool = field(
         FieldMetadata(
             action='store_true',
@@ -662,13 +707,11 @@ class BuildArguments(FindBuildArguments):
     ignore_warning_files: t.Optional[t.List[t.Union[str, TextIOWrapper]]] = field(
         FieldMetadata(
             validate_method=[ValidateMethod.TO_LIST],
+            # files are opened while applying the arguments, not while parsing the CLI
             deprecates={
-                'ignore_warning_file': {
-                    'type': argparse.FileType('r'),
-                }
+                'ignore_warning_file': {},
             },
             nargs='+',
-            type=argparse.FileType('r'),
         ),
         description='Path to the files containing the patterns to ignore the warnings in the build output',
         validation_alias=AliasChoices('ignore_warning_files', 'ignore_warning_file'),
@@ -681,6 +724,25 @@ class BuildArguments(FindBuildArguments):
         description='Copy the sdkconfig file to the build directory',
         default=False,  # type: ignore
     )
+    reuse_work_dir: bool = field(
+        FieldMetadata(
+            action='store_true',
+        ),
+        description='Skip copying the app to the work directory when the app files are not changed '
+        'since the last copy, judged by their paths, sizes and modification times. '
+        'Files generated in the work directory by the previous builds are kept',
+        default=False,  # type: ignore
+    )
+    hardlink_work_dir: bool = field(
+        FieldMetadata(
+            action='store_true',
+        ),
+        description='Hard link the app files to the work directory instead of copying them, '
+        'falls back to copying when the files can not be linked, e.g. across file systems. '
+        'Only use it when the build does not modify the app files in place, '
+        'since the changes would be made to the original files as well',
+        default=False,  # type: ignore
+    )
 
     # Attrs that support placeholders
     collect_size_info_filename: t.Optional[str] = field(
@@ -721,20 +783,18 @@ class BuildArguments(FindBuildArguments):
     def model_post_init(self, __context: Any) -> None:
         super().model_post_init(__context)
 
-        ignore_warnings_regexes = []
-        if self.ignore_warning_strs:
-            for s in self.ignore_warning_strs:
-                ignore_warnings_regexes.append(re.compile(s))
+        ignore_warnings_strs: t.List[str] = list(self.ignore_warning_strs or [])
         if self.ignore_warning_files:
             for f in self.ignore_warning_files:
                 if isinstance(f, str):
+                    if not os.path.isfile(f):
+                        raise InvalidCommand(f'Ignore warning file {f} does not exist')
+
                     with open(f) as fr:
-                        for s in fr:
-                            ignore_warnings_regexes.append(re.compile(s.strip()))
+                        ignore_warnings_strs.extend(s.strip() for s in fr)
                 else:
-                    for s in f:
-                        ignore_warnings_regexes.append(re.compile(s.strip()))
-        App.IGNORE_WARNS_REGEXES = ignore_warnings_regexes
+                    ignore_warnings_strs.extend(s.strip() for s in f)
+        App.set_ignore_warns_regexes(ignore_warnings_strs)
 
     @computed_field  # type: ignore
     @property
@@ -806,11 +866,13 @@ def add_args_to_parser(argument_cls: t.Type[BaseArguments], parser: argparse.Arg
     for f_name, f in argument_cls.model_fields.items():
         f_meta = get_meta(f)
         if f_meta and f_meta.deprecates:
-            for dep_f_name, dep_f_kwargs in f_meta.deprecates.items():
+            for dep_f_name, dep_f_meta in f_meta.deprecates.items():
                 _names = [_snake_case_to_cli_arg_name(dep_f_name)]
-                _shorthand = dep_f_kwargs.pop('shorthand', None)
+                _shorthand = dep_f_meta.get('shorthand')
                 if _shorthand:
                     _names.append(_shorthand)
+                # don't pop from the field metadata, it's shared by all the parsers
+                dep_f_kwargs = {k: v for k, v in dep_f_meta.items() if k != 'shorthand'}
 
                 if f_meta.hidden:  # f is hidden, use deprecated field instead
                     help_msg = f.description
@@ -859,24 +921,34 @@ def add_args_to_parser(argument_cls: t.Type[BaseArguments], parser: argparse.Arg
         )
 
 
+@functools.lru_cache(maxsize=None)
+def _args_doc_params(argument_cls: t.Type[GlobalArguments]) -> str:
+    doc_str = ''
+    for f_name, f in argument_cls.model_fields.items():
+        # typing generic alias is not a class
+        _annotation = f.annotation.__name__ if inspect.isclass(f.annotation) else f.annotation
+        doc_str += f'    :param {f_name}: {f.description}\n'
+        doc_str += f'    :type {f_name}: {_annotation}\n'
+
+    return doc_str
+
+
 def add_args_to_obj_doc_as_params(argument_cls: t.Type[GlobalArguments], obj: t.Any = None) -> None:
     """
     Add arguments to the function as parameters.
 
+    Calling it multiple times with the same object won't duplicate the parameters.
+
     :param argument_cls: argument class
     :param obj: object to add the docstring to
     """
     _obj = obj or argument_cls
+    _doc_params = _args_doc_params(argument_cls)
     _doc_str = _obj.__doc__ or ''
-    _doc_str += '\n'
-
-    for f_name, f in argument_cls.model_fields.items():
-        # typing generic alias is not a class
-        _annotation = f.annotation.__name__ if inspect.isclass(f.annotation) else f.annotation
-        _doc_str += f'    :param {f_name}: {f.description}\n'
-        _doc_str += f'    :type {f_name}: {_annotation}\n'
+    if _doc_str.endswith(_doc_params):
+        return
 
-    _obj.__doc__ = _doc_str
+    _obj.__doc__ = _doc_str + '\n' + _doc_params
 
 
 def apply_config_file(config_file: t.Optional[str] = None, reset: bool = False) -> None:
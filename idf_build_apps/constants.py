@@ -16,6 +16,7 @@ DEFAULT_SDKCONFIG = 'sdkconfig.defaults'
 SUPPORTED_TARGETS = esp_bool_parser.SUPPORTED_TARGETS
 PREVIEW_TARGETS = esp_bool_parser.PREVIEW_TARGETS
 ALL_TARGETS = esp_bool_parser.ALL_TARGETS
+ALL_TARGETS_SET = frozenset(ALL_TARGETS)  # for fast membership tests
 IDF_VERSION_MAJOR = esp_bool_parser.IDF_VERSION_MAJOR
 IDF_VERSION_MINOR = esp_bool_parser.IDF_VERSION_MINOR
 IDF_VERSION_PATCH = esp_bool_parser.IDF_VERSION_PATCH
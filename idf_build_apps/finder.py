@@ -6,6 +6,10 @@ import os
 import os.path
 import re
 import typing as t
+from concurrent.futures import (
+    Future,
+    ThreadPoolExecutor,
+)
 from pathlib import (
     Path,
 )
@@ -32,11 +36,13 @@ def _get_apps_from_path(
     *,
     app_cls: t.Type[App] = CMakeApp,
     args: FindArguments,
+    is_app: t.Optional[bool] = None,
 ) -> t.List[App]:
     # trigger test
     def _validate_app(_app: App) -> bool:
         if target not in _app.supported_targets:
-            LOGGER.debug('=> Ignored. %s only supports targets: %s', _app, ', '.join(_app.supported_targets))
+            if LOGGER.isEnabledFor(logging.DEBUG):
+                LOGGER.debug('=> Ignored. %s only supports targets: %s', _app, ', '.join(_app.supported_targets))
             _app.build_status = BuildStatus.DISABLED
             return args.include_disabled_apps
 
@@ -55,7 +61,10 @@ def _get_apps_from_path(
 
         return True
 
-    if not app_cls.is_app(path):
+    if is_app is None:
+        is_app = app_cls.is_app(path)
+
+    if not is_app:
         LOGGER.debug('Skipping. %s is not an app', path)
         return []
 
@@ -155,24 +164,41 @@ def _find_apps(
     apps = []
     # handle the exclude list, since the config file might use linux style, but run in windows
     exclude_paths_list = [to_absolute_path(p) for p in args.exclude or []]
-    for root, dirs, _ in os.walk(path):
-        LOGGER.debug('Entering %s', root)
-        root_path = to_absolute_path(root)
-        if root_path in exclude_paths_list:
-            LOGGER.debug('=> Skipping %s (excluded)', root)
-            del dirs[:]
-            continue
+    # checked once, the walk may visit lots of directories
+    debug_enabled = LOGGER.isEnabledFor(logging.DEBUG)
+    # `is_app` is I/O bound, check the sub dirs in the background while walking the current one
+    is_app_futures: t.Dict[str, Future] = {}
+    with ThreadPoolExecutor() as executor:
+        for root, dirs, _ in os.walk(path):
+            is_app_future = is_app_futures.pop(root, None)
+            if debug_enabled:
+                LOGGER.debug('Entering %s', root)
+            root_path = to_absolute_path(root)
+            if root_path in exclude_paths_list:
+                LOGGER.debug('=> Skipping %s (excluded)', root)
+                del dirs[:]
+                continue
 
-        if os.path.basename(root_path) == 'managed_components':  # idf-component-manager
-            LOGGER.debug('=> Skipping %s (managed components)', root_path)
-            del dirs[:]
-            continue
+            if os.path.basename(root_path) == 'managed_components':  # idf-component-manager
+                LOGGER.debug('=> Skipping %s (managed components)', root_path)
+                del dirs[:]
+                continue
 
-        _found_apps = _get_apps_from_path(root, target, app_cls=app_cls, args=args)
-        if _found_apps:  # root has at least one app
-            LOGGER.debug('=> Stop iteration sub dirs of %s since it has apps', root)
-            del dirs[:]
-            apps.extend(_found_apps)
-            continue
+            _found_apps = _get_apps_from_path(
+                root,
+                target,
+                app_cls=app_cls,
+                args=args,
+                is_app=is_app_future.result() if is_app_future else None,
+            )
+            if _found_apps:  # root has at least one app
+                LOGGER.debug('=> Stop iteration sub dirs of %s since it has apps', root)
+                del dirs[:]
+                apps.extend(_found_apps)
+                continue
+
+            for d in dirs:
+                _p = os.path.join(root, d)
+                is_app_futures[_p] = executor.submit(app_cls.is_app, _p)
 
-    return apps
+    return sorted(apps)
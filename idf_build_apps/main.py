@@ -4,20 +4,23 @@
 # SPDX-License-Identifier: Apache-2.0
 
 import argparse
+import heapq
 import json
 import logging
 import os
 import sys
 import textwrap
 import typing as t
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
 
-import argcomplete
 from pydantic import (
     Field,
     create_model,
 )
 
 from idf_build_apps.args import (
+    BaseArguments,
     BuildArguments,
     DumpManifestShaArguments,
     FindArguments,
@@ -99,26 +102,65 @@ def find_apps(
     else:
         app_cls = find_arguments.build_system
 
-    apps = []
     if find_arguments.target == 'all':
         targets = ALL_TARGETS
     else:
         targets = [find_arguments.target]
 
-    for _t in targets:
-        for _p in find_arguments.paths:
-            apps.extend(
+    # apps found under each path are sorted already, merge them instead of sorting all over again
+    apps = list(
+        heapq.merge(
+            *[
                 _find_apps(
                     _p,
                     _t,
                     app_cls=app_cls,
                     args=find_arguments,
                 )
-            )
+                for _t in targets
+                for _p in find_arguments.paths
+            ]
+        )
+    )
 
     LOGGER.info(f'Found {len(apps)} apps in total')
 
-    return sorted(apps)
+    return apps
+
+
+class _JsonLinesWriter:
+    """
+    Append json lines to a collect file. The file is opened once, at the first write,
+    and closed when exiting the context. Falsy if no file path is given.
+
+    The lines are buffered instead of being flushed one by one. If the process is killed,
+    the lines not flushed yet are lost.
+    """
+
+    def __init__(self, path: t.Optional[str]) -> None:
+        self.path = path
+        self._fw: t.Optional[t.TextIO] = None
+
+    def __bool__(self) -> bool:
+        return bool(self.path)
+
+    def __enter__(self) -> '_JsonLinesWriter':
+        return self
+
+    def __exit__(self, *args) -> None:
+        if self._fw is not None:
+            self._fw.close()
+            self._fw = None
+
+    def write_line(self, s: str) -> None:
+        fw = self._fw
+        if fw is None:
+            if not self.path:
+                raise ValueError('No collect file to write to')
+
+            fw = self._fw = open(self.path, 'a')
+
+        fw.write(s + '\n')
 
 
 def build_apps(
@@ -169,18 +211,36 @@ def build_apps(
             os.remove(f)
             LOGGER.debug('Remove existing collect file %s', f)
 
-    exit_code = 0
-    for i, app in enumerate(apps):
-        index = i + 1  # we use 1-based
-        if index < start or index > stop:
-            continue
+    app_info_writer = _JsonLinesWriter(build_arguments.collect_app_info)
+    size_info_writer = _JsonLinesWriter(build_arguments.collect_size_info)
 
+    # start and stop are 1-based, both inclusive
+    indexed_apps = list(enumerate(apps[start - 1 : stop], start=start))
+    for index, app in indexed_apps:
         # attrs
         app.dry_run = build_arguments.dry_run
         app.index = index
         app.verbose = build_arguments.build_verbose
         app.copy_sdkconfig = build_arguments.copy_sdkconfig
-
+        app.reuse_work_dir = build_arguments.reuse_work_dir
+        app.hardlink_work_dir = build_arguments.hardlink_work_dir
+
+    if build_arguments.jobs > 1:
+        # the paths may depend on the index, check them after the attrs are set.
+        # the work directory is modified in place (sdkconfig, managed_components, ...),
+        # sharing it is unsafe even with separated build directories
+        apps_by_path: t.Dict[str, App] = {}
+        for _, app in indexed_apps:
+            for path in {os.path.realpath(app.work_dir), os.path.realpath(app.build_path)}:
+                if path in apps_by_path and apps_by_path[path] is not app:
+                    raise InvalidCommand(
+                        f'Apps {apps_by_path[path]} and {app} share the same directory {path}, '
+                        f'they can not be built in parallel. '
+                        f'Set --work-dir with placeholders, e.g. "@f_@t_@w", to separate them, or build with --jobs 1'
+                    )
+                apps_by_path[path] = app
+
+    def _build_app(index: int, app: App) -> None:
         LOGGER.info('(%s/%s) Building app: %s', index, len(apps), app)
 
         app.build(
@@ -189,28 +249,51 @@ def build_apps(
             modified_files=build_arguments.modified_files,
             check_app_dependencies=build_arguments.dependency_driven_build_enabled,
         )
-        test_suite.add_test_case(TestCase.from_app(app))
 
-        if app.build_comment:
-            LOGGER.info('%s (%s)', app.build_status.value, app.build_comment)
-        else:
-            LOGGER.info('%s', app.build_status.value)
+    def _iter_built_apps() -> t.Generator[t.Tuple[int, App], None, None]:
+        if build_arguments.jobs <= 1:
+            for index, app in indexed_apps:
+                _build_app(index, app)
+                yield index, app
+            return
+
+        # the builds are run by subprocesses, threads are enough to run them in parallel.
+        # the results are still handled one by one, in the original order
+        with ThreadPoolExecutor(max_workers=build_arguments.jobs) as executor:
+            futures = [(index, app, executor.submit(_build_app, index, app)) for index, app in indexed_apps]
+            try:
+                for index, app, future in futures:
+                    future.result()
+                    yield index, app
+            finally:
+                # stop the pending builds when the build fails without --keep-going
+                for *_, future in futures:
+                    future.cancel()
+
+    failed_count = 0
+    # closing() to stop the pending builds right away when returning early
+    with app_info_writer, size_info_writer, closing(_iter_built_apps()) as built_apps:
+        for index, app in built_apps:
+            test_suite.add_test_case(TestCase.from_app(app))
+
+            if app.build_comment:
+                LOGGER.info('%s (%s)', app.build_status.value, app.build_comment)
+            else:
+                LOGGER.info('%s', app.build_status.value)
 
-        if build_arguments.collect_app_info:
-            with open(build_arguments.collect_app_info, 'a') as fw:
-                fw.write(app.to_json() + '\n')
-            LOGGER.debug('Recorded app info in %s', build_arguments.collect_app_info)
+            if app_info_writer:
+                app_info_writer.write_line(app.to_json())
+                LOGGER.debug('Recorded app info in %s', build_arguments.collect_app_info)
 
-        if app.build_status == BuildStatus.FAILED:
-            if not build_arguments.keep_going:
-                return 1
-            else:
-                exit_code = 1
-        elif app.build_status == BuildStatus.SUCCESS:
-            if build_arguments.collect_size_info and app.size_json_path:
-                if os.path.isfile(app.size_json_path):
-                    with open(build_arguments.collect_size_info, 'a') as fw:
-                        fw.write(
+            if app.build_status == BuildStatus.FAILED:
+                if not build_arguments.keep_going:
+                    return 1
+                else:
+                    failed_count += 1
+            elif app.build_status == BuildStatus.SUCCESS:
+                if size_info_writer and app.size_json_path:
+                    if os.path.isfile(app.size_json_path):
+                        size_info_writer.write_line(
                             json.dumps(
                                 {
                                     'app_name': app.name,
@@ -219,17 +302,20 @@ def build_apps(
                                     'path': app.size_json_path,
                                 }
                             )
-                            + '\n'
                         )
-                    LOGGER.debug('Recorded size info file path in %s', build_arguments.collect_size_info)
+                        LOGGER.debug('Recorded size info file path in %s', build_arguments.collect_size_info)
 
-        LOGGER.info('')  # add one empty line for separating different builds
+            LOGGER.info('')  # add one empty line for separating different builds
 
     if build_arguments.junitxml:
         TestReport([test_suite], build_arguments.junitxml).create_test_report()
         LOGGER.info('Generated junit report for build apps: %s', build_arguments.junitxml)
 
-    return exit_code
+    if failed_count:
+        LOGGER.error('%s of %s apps failed to build', failed_count, stop - start + 1)
+        return 1
+
+    return 0
 
 
 class IdfBuildAppsCliFormatter(argparse.HelpFormatter):
@@ -278,7 +364,14 @@ class IdfBuildAppsCliFormatter(argparse.HelpFormatter):
         return _help
 
 
-def get_parser() -> argparse.ArgumentParser:
+def get_parser(action: t.Optional[str] = None) -> argparse.ArgumentParser:
+    """
+    Get the CLI argument parser
+
+    :param action: only register the options of this sub-command. Set to an empty string to register none of them.
+        By default register the options of all sub-commands
+    :return: argument parser
+    """
     parser = argparse.ArgumentParser(
         description='Tools for building ESP-IDF related apps. '
         'Some CLI options can be expanded by the following placeholders, like "--work-dir", "--build-dir", etc.:\n'
@@ -309,7 +402,6 @@ def get_parser() -> argparse.ArgumentParser:
         formatter_class=IdfBuildAppsCliFormatter,
         parents=[common_args],
     )
-    add_args_to_parser(FindArguments, find_parser)
 
     #########
     # Build #
@@ -322,7 +414,6 @@ def get_parser() -> argparse.ArgumentParser:
         formatter_class=IdfBuildAppsCliFormatter,
         parents=[common_args],
     )
-    add_args_to_parser(BuildArguments, build_parser)
 
     ###############
     # Completions #
@@ -359,7 +450,16 @@ def get_parser() -> argparse.ArgumentParser:
         'This could be useful in CI to check if the manifest files are changed.',
         parents=[common_args],
     )
-    add_args_to_parser(DumpManifestShaArguments, dump_manifest_parser)
+
+    # register the options only for the sub-command that would be parsed
+    action_parsers: t.Dict[str, t.Tuple[t.Type[BaseArguments], argparse.ArgumentParser]] = {
+        'find': (FindArguments, find_parser),
+        'build': (BuildArguments, build_parser),
+        'dump-manifest-sha': (DumpManifestShaArguments, dump_manifest_parser),
+    }
+    for _action, (_argument_cls, _parser) in action_parsers.items():
+        if action is None or action == _action:
+            add_args_to_parser(_argument_cls, _parser)
 
     return parser
 
@@ -375,9 +475,26 @@ def handle_completions(args: argparse.Namespace) -> None:
         print(completion_instructions)
 
 
+def _get_cli_action() -> t.Optional[str]:
+    # autocompletion needs the options of all sub-commands
+    if '_ARGCOMPLETE' in os.environ:
+        return None
+
+    # sub-command is always the first argument, since there's no global options
+    if len(sys.argv) > 1 and not sys.argv[1].startswith('-'):
+        return sys.argv[1]
+
+    # no sub-command, e.g. `idf-build-apps --help`. options of the sub-commands are not needed
+    return ''
+
+
 def main():
-    parser = get_parser()
-    argcomplete.autocomplete(parser)
+    parser = get_parser(_get_cli_action())
+    # argcomplete is only needed while the shell is asking for completions
+    if '_ARGCOMPLETE' in os.environ:
+        import argcomplete
+
+        argcomplete.autocomplete(parser)
     args = parser.parse_args()
 
     if args.action == 'completions':
@@ -407,15 +524,13 @@ def main():
             os.makedirs(os.path.dirname(os.path.realpath(arguments.output)), exist_ok=True)
             with open(arguments.output, 'w') as fw:
                 if arguments.output_format == 'raw':
-                    for app in apps:
-                        fw.write(app.to_json() + '\n')
+                    fw.writelines(app.to_json() + '\n' for app in apps)
                 elif arguments.output_format == 'json':
-                    fw.write(json.dumps([app.model_dump() for app in apps], indent=2))
+                    json.dump([app.model_dump() for app in apps], fw, indent=2)
                 else:
                     raise InvalidCommand(f'Output format {arguments.output_format} is not supported.')
         else:
-            for app in apps:
-                print(app)
+            sys.stdout.writelines(f'{app}\n' for app in apps)
 
         sys.exit(0)
 
@@ -426,23 +541,24 @@ def main():
 
     ret_code = build_apps(apps, build_arguments=arguments)
 
-    built_apps = [app for app in apps if app.build_status == BuildStatus.SUCCESS]
-    if built_apps:
-        print('Successfully built the following apps:')
-        for app in built_apps:
-            print(f'  {app}')
-
-    skipped_apps = [app for app in apps if app.build_status == BuildStatus.SKIPPED]
-    if skipped_apps:
-        print('Skipped building the following apps:')
-        for app in skipped_apps:
-            print(f'  {app}')
-
-    failed_apps = [app for app in apps if app.build_status == BuildStatus.FAILED]
-    if failed_apps:
-        print('Failed building the following apps:')
-        for app in failed_apps:
-            print(f'  {app}')
+    # format each app only once, in a single pass
+    summary: t.Dict[BuildStatus, t.List[str]] = {
+        BuildStatus.SUCCESS: [],
+        BuildStatus.SKIPPED: [],
+        BuildStatus.FAILED: [],
+    }
+    for app in apps:
+        if app.build_status in summary:
+            summary[app.build_status].append(f'  {app}\n')
+
+    for status, title in [
+        (BuildStatus.SUCCESS, 'Successfully built the following apps:'),
+        (BuildStatus.SKIPPED, 'Skipped building the following apps:'),
+        (BuildStatus.FAILED, 'Failed building the following apps:'),
+    ]:
+        if summary[status]:
+            print(title)
+            sys.stdout.writelines(summary[status])
 
     if ret_code != 0:
         sys.exit(ret_code)
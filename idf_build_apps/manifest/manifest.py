@@ -1,8 +1,10 @@
 # SPDX-FileCopyrightText: 2022-2025 Espressif Systems (Shanghai) CO LTD
 # SPDX-License-Identifier: Apache-2.0
+import copy
 import logging
 import os
 import typing as t
+from collections import OrderedDict
 from hashlib import sha512
 
 from esp_bool_parser import BoolStmt, parse_bool_expr
@@ -241,15 +243,41 @@ class DefaultRule(FolderRule):
         super().__init__(folder)
 
 
+def _cache_size_from_env(default: int = 64) -> int:
+    """
+    Read the manifest cache size from the env var `IDF_BUILD_APPS_MANIFEST_CACHE_SIZE`
+
+    :param default: used when the env var is not set or invalid
+    :return: max number of parsed manifest files kept in memory
+    """
+    value = os.getenv('IDF_BUILD_APPS_MANIFEST_CACHE_SIZE')
+    if not value:
+        return default
+
+    try:
+        return int(value)
+    except ValueError:
+        LOGGER.warning('Invalid IDF_BUILD_APPS_MANIFEST_CACHE_SIZE "%s", use the default value %s', value, default)
+        return default
+
+
 class Manifest:
     # could be reassigned later
     CHECK_MANIFEST_RULES = False
+    # max number of parsed manifest files kept in memory, set to 0 to disable the cache
+    CACHE_SIZE = _cache_size_from_env()
+
+    # (abspath, mtime) -> parsed manifest dict
+    _CACHE: 't.OrderedDict[t.Tuple[str, int], t.Dict]' = OrderedDict()
 
     def __init__(self, rules: t.Iterable[FolderRule], *, root_path: str = os.curdir) -> None:
         self.rules = sorted(rules, key=lambda x: x.folder)
 
         self._root_path = to_absolute_path(root_path)
 
+        # folder -> rule
+        self._most_suitable_rules: t.Dict[str, FolderRule] = {}
+
     @classmethod
     def from_files(cls, paths: t.Iterable[PathLike], *, root_path: str = os.curdir) -> 'Manifest':
         """
@@ -262,12 +290,11 @@ class Manifest:
         # folder, defined as dict
         _known_folders: t.Dict[str, PathLike] = dict()
 
+        # collect the rules of all files into one list, sorted only once while creating the Manifest
         rules: t.List[FolderRule] = []
         for path in paths:
             LOGGER.debug('Loading manifest file %s', path)
-            _manifest = cls.from_file(path, root_path=root_path)
-
-            for rule in _manifest.rules:
+            for rule in cls._rules_from_file(path, root_path=root_path):
                 if rule.folder in _known_folders:
                     msg = f'Folder "{rule.folder}" is already defined in {_known_folders[rule.folder]}'
                     if cls.CHECK_MANIFEST_RULES:
@@ -276,8 +303,7 @@ class Manifest:
                         LOGGER.warning(msg)
 
                 _known_folders[rule.folder] = path
-
-            rules.extend(_manifest.rules)
+                rules.append(rule)
 
         return Manifest(rules, root_path=root_path)
 
@@ -290,7 +316,32 @@ class Manifest:
         :param root_path: root path for relative paths in manifest file
         :return: Manifest instance
         """
-        manifest_dict = parse(path)
+        return Manifest(cls._rules_from_file(path, root_path=root_path), root_path=root_path)
+
+    @classmethod
+    def _parse_file(cls, path: PathLike) -> t.Dict:
+        # the parsed dict doesn't depend on the root path, the folders are joined with it later
+        cache_key = (os.path.abspath(path), os.stat(path).st_mtime_ns)
+        if cache_key in cls._CACHE:
+            cls._CACHE.move_to_end(cache_key)
+            LOGGER.debug('Use cached manifest file %s', path)
+        else:
+            manifest_dict = parse(path)
+            if cls.CACHE_SIZE <= 0:
+                return manifest_dict
+
+            cls._CACHE[cache_key] = manifest_dict
+            while len(cls._CACHE) > cls.CACHE_SIZE:
+                cls._CACHE.popitem(last=False)
+
+        # the rules may keep references to the lists of the dict, don't share them with the cached one
+        return copy.deepcopy(cls._CACHE[cache_key])
+
+    @classmethod
+    def _rules_from_file(cls, path: PathLike, *, root_path: str = os.curdir) -> t.List[FolderRule]:
+        # only the parsed dict is cached. the rules are created on each load,
+        # since the evaluated values of the if clauses are cached in them, e.g. the env vars
+        manifest_dict = cls._parse_file(path)
 
         rules: t.List[FolderRule] = []
         for folder, folder_rule in manifest_dict.items():
@@ -301,19 +352,23 @@ class Manifest:
             if not os.path.isabs(folder):
                 folder = os.path.join(root_path, folder)
 
-            if not os.path.exists(folder):
-                msg = f'Folder "{folder}" does not exist. Please check your manifest file {path}'
-                if cls.CHECK_MANIFEST_RULES:
-                    raise InvalidManifest(msg)
-                else:
-                    LOGGER.warning(msg)
+            cls._check_folder_exists(folder, path)
 
             try:
                 rules.append(FolderRule(folder, **folder_rule if folder_rule else {}))
             except InvalidIfClause as e:
                 raise InvalidManifest(f'Invalid manifest file {path}: {e}')
 
-        return Manifest(rules, root_path=root_path)
+        return rules
+
+    @classmethod
+    def _check_folder_exists(cls, folder: str, path: PathLike) -> None:
+        if not os.path.exists(folder):
+            msg = f'Folder "{folder}" does not exist. Please check your manifest file {path}'
+            if cls.CHECK_MANIFEST_RULES:
+                raise InvalidManifest(msg)
+            else:
+                LOGGER.warning(msg)
 
     def dump_sha_values(self, sha_filepath: str) -> None:
         """
@@ -376,11 +431,18 @@ class Manifest:
 
     def most_suitable_rule(self, _folder: str) -> FolderRule:
         folder = to_absolute_path(_folder)
+        # looked up several times for each app, by the target and dependency checks
+        if folder in self._most_suitable_rules:
+            return self._most_suitable_rules[folder]
+
         for rule in self.rules[::-1]:
             if os.path.commonpath([folder, rule.folder]) == rule.folder:
-                return rule
+                break
+        else:
+            rule = DefaultRule(folder)
 
-        return DefaultRule(folder)
+        self._most_suitable_rules[folder] = rule
+        return rule
 
     def enable_build_targets(
         self, folder: str, default_sdkconfig_target: t.Optional[str] = None, config_name: t.Optional[str] = None
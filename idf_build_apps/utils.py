@@ -1,18 +1,19 @@
 # SPDX-FileCopyrightText: 2022-2024 Espressif Systems (Shanghai) CO LTD
 # SPDX-License-Identifier: Apache-2.0
 
+import codecs
 import fnmatch
 import functools
 import glob
+import io
 import logging
+import mmap
 import os
 import shutil
+import stat
 import subprocess
 import sys
 import typing as t
-from copy import (
-    deepcopy,
-)
 from pathlib import Path
 
 from packaging.version import (
@@ -155,6 +156,47 @@ def find_first_match(pattern: str, path: str) -> t.Optional[str]:
     return None
 
 
+# (st_dev, st_ino, st_mtime_ns, st_size, content) -> bool
+_FILE_CONTAINS_CACHE: t.Dict[t.Tuple[int, int, int, int, bytes], bool] = {}
+
+
+def file_contains(filepath: str, content: bytes) -> bool:
+    """
+    Check if the file contains the content, without reading the whole file into memory.
+    The result is cached until the file is modified.
+
+    :param filepath: file path
+    :param content: content to search for, non-empty
+    :return: True if the file exists and contains the content
+    """
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return False
+
+    if not stat.S_ISREG(st.st_mode):
+        return False
+
+    # the same file could be reached by different paths, e.g. symlinks
+    key = (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size, content)
+    if key in _FILE_CONTAINS_CACHE:
+        return _FILE_CONTAINS_CACHE[key]
+
+    # also covers empty files, which can't be mmap-ed
+    if st.st_size < len(content):
+        res = False
+    else:
+        with open(filepath, 'rb') as fr:
+            with mmap.mmap(fr.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                res = mm.find(content) != -1
+
+    _FILE_CONTAINS_CACHE[key] = res
+    return res
+
+
+_SUBPROCESS_READ_SIZE = 65536
+
+
 def subprocess_run(
     cmd: t.List[str],
     log_terminal: bool = True,
@@ -177,32 +219,77 @@ def subprocess_run(
 
     subprocess_env = None
     if additional_env_dict is not None:
-        subprocess_env = deepcopy(os.environ)
+        # a plain dict, updating a copy of `os.environ` itself would call putenv for the current process
+        subprocess_env = os.environ.copy()
         subprocess_env.update(additional_env_dict)
 
-    p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, env=subprocess_env, **kwargs)
+    def _popen(stdout: t.Any) -> subprocess.Popen:
+        return subprocess.Popen(cmd, stdout=stdout, stderr=subprocess.STDOUT, env=subprocess_env, **kwargs)
 
-    def _log_stdout(fs: t.Optional[t.IO[str]] = None):
-        if p.stdout:
-            for line in p.stdout:
-                if isinstance(line, bytes):
-                    line = line.decode('utf-8')
+    if log_fs and not log_terminal:
+        # nothing to print, let the subprocess write to the log file directly,
+        # instead of copying all the output through a pipe
+        if isinstance(log_fs, str):
+            # binary mode, the subprocess writes the raw bytes
+            with open(log_fs, 'ab') as fb:
+                return _check_returncode(cmd, _popen(fb).wait(), check)
+
+        if _has_fileno(log_fs):
+            log_fs.flush()
+            return _check_returncode(cmd, _popen(log_fs).wait(), check)
 
-                if log_terminal:
-                    sys.stdout.write(line)
+    p = _popen(subprocess.PIPE)
 
-                if fs:
-                    fs.write(line)
+    def _iter_stdout() -> t.Iterator[str]:
+        if isinstance(p.stdout, io.TextIOBase):  # text mode, decoded already
+            yield from p.stdout
+            return
+
+        # read whatever is available in big chunks instead of line by line,
+        # the incremental decoder keeps the multi-byte characters split between chunks
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        while True:
+            chunk = p.stdout.read1(_SUBPROCESS_READ_SIZE)  # type: ignore
+            s = decoder.decode(chunk, final=not chunk)
+            if s:
+                yield s
+
+            if not chunk:
+                return
+
+    def _log_stdout(fs: t.Optional[t.IO[str]] = None):
+        for s in _iter_stdout():
+            if log_terminal:
+                sys.stdout.write(s)
+
+            if fs:
+                fs.write(s)
 
     if p.stdout:
         if log_fs:
             if isinstance(log_fs, str):
-                with open(log_fs, 'a') as fa:
-                    _log_stdout(fa)
+                # text mode, the output is decoded already
+                with open(log_fs, 'a') as fw:
+                    _log_stdout(fw)
             else:
                 _log_stdout(log_fs)
+        else:
+            # drain the pipe anyway, otherwise the subprocess may block on a full pipe
+            _log_stdout()
+
+    return _check_returncode(cmd, p.wait(), check)
+
+
+def _has_fileno(fs: t.IO[str]) -> bool:
+    try:
+        fs.fileno()
+    except (AttributeError, OSError, ValueError):  # io.UnsupportedOperation is both OSError and ValueError
+        return False
 
-    returncode = p.wait()
+    return True
+
+
+def _check_returncode(cmd: t.List[str], returncode: int, check: bool) -> int:
     if check and returncode != 0:
         raise BuildError(f'Command {cmd} returned non-zero exit status {returncode}')
 
@@ -333,6 +420,19 @@ def files_matches_patterns(
     return False
 
 
+@functools.lru_cache(maxsize=None)
+def _compared_field_names(model_cls: t.Type['BaseModel']) -> t.Tuple[str, ...]:
+    """
+    Names of the fields dumped by `model_dump`, in the same order, without the `__EQ_IGNORE_FIELDS__`
+
+    :param model_cls: model class
+    :return: field names
+    """
+    names = [k for k, v in model_cls.model_fields.items() if not v.exclude]
+    names.extend(model_cls.model_computed_fields)
+    return tuple(k for k in names if k not in model_cls.__EQ_IGNORE_FIELDS__)
+
+
 @functools.total_ordering
 class BaseModel(_BaseModel):
     """
@@ -343,10 +443,8 @@ class BaseModel(_BaseModel):
 
     def __lt__(self, other: t.Any) -> bool:
         if isinstance(other, self.__class__):
-            for k in self.model_dump():
-                if k in self.__EQ_IGNORE_FIELDS__:
-                    continue
-
+            # compare field by field, instead of dumping the whole model for each comparison while sorting
+            for k in _compared_field_names(self.__class__):
                 self_attr = getattr(self, k, '') or ''
                 other_attr = getattr(other, k, '') or ''
 
@@ -375,7 +473,8 @@ class BaseModel(_BaseModel):
 
     def __hash__(self) -> int:
         hash_list = []
-        for v in self.model_dump().values():
+        # the same fields as compared in `__eq__`, equal models must have the same hash
+        for v in (getattr(self, k) for k in _compared_field_names(self.__class__)):
             if isinstance(v, list):
                 hash_list.append(tuple(v))
             elif isinstance(v, dict):
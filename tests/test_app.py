@@ -1,6 +1,9 @@
 # SPDX-FileCopyrightText: 2023-2024 Espressif Systems (Shanghai) CO LTD
 # SPDX-License-Identifier: Apache-2.0
 
+import logging
+import os
+import re
 
 import pytest
 from pydantic import (
@@ -12,6 +15,13 @@ from idf_build_apps import (
     CMakeApp,
     MakeApp,
 )
+from idf_build_apps.app import (
+    App,
+    _parse_sdkconfig_line,
+)
+from idf_build_apps.constants import (
+    BuildStage,
+)
 from idf_build_apps.main import (
     json_to_app,
 )
@@ -60,6 +70,7 @@ def test_app_sorting():
 
     # __EQ_IGNORE_FIELDS__
     assert d == e
+    assert hash(d) == hash(e)
     assert not d < e
     assert not d > e
 
@@ -95,3 +106,144 @@ def test_app_init_from_another():
     assert b.target == 'esp32c3'
     assert 'build_esp32_' == a.build_dir
     assert 'build_esp32c3_' == b.build_dir
+
+
+def test_app_expand_placeholders(monkeypatch):
+    a = CMakeApp('foo', 'esp32', build_dir='build_@t_@w_@n_@i')
+    assert a.build_dir == 'build_esp32_foo_@i'
+
+    a.index = 1
+    assert a.build_dir == 'build_esp32_foo_1'
+
+    a.config_name = 'release'
+    assert a.build_dir == 'build_esp32_release_foo_1'
+
+    monkeypatch.setenv('BUILD_SUFFIX', 'bar')
+    b = CMakeApp('foo', 'esp32', build_dir='build_@w_@w_${BUILD_SUFFIX}')
+    assert b.build_dir == 'build_@w_bar'
+
+
+def test_app_is_error_or_warning(monkeypatch):
+    a = CMakeApp('foo', 'esp32')
+    assert a.is_error_or_warning('foo.c:1: warning: unused variable') == (True, False)
+    assert a.is_error_or_warning('nothing to see here') == (False, False)
+    assert a.is_error_or_warning('CMake Error: foo') == (True, False)
+    assert a.is_error_or_warning('WARNİNG: non-ascii') == (True, False)
+
+    monkeypatch.setattr(CMakeApp, 'IGNORE_WARNS_REGEXES', [re.compile('unused'), re.compile(r'(x)\1')])
+    assert a.is_error_or_warning('foo.c:1: warning: unused variable') == (True, True)
+    assert a.is_error_or_warning('foo.c:1: warning: xx') == (True, True)
+    assert a.is_error_or_warning('foo.c:1: error: x') == (True, False)
+
+    # conditional group reference
+    monkeypatch.setattr(CMakeApp, 'IGNORE_WARNS_REGEXES', [re.compile('(un)used'), re.compile(r'(x)?(?(1)y|z)')])
+    assert a.is_error_or_warning('foo.c:1: warning: xy') == (True, True)
+
+    monkeypatch.setattr(CMakeApp, 'IGNORE_WARNS_REGEXES', [re.compile('unused'), re.compile('deprecated')])
+    assert a.is_error_or_warning('foo.c:1: warning: deprecated') == (True, True)
+    assert a.is_error_or_warning('foo.c:1: error: x') == (True, False)
+
+
+def test_app_sdkconfig_files_dedup(tmp_path):
+    (tmp_path / 'foo').mkdir()
+    (tmp_path / 'foo' / 'sdkconfig.defaults').write_text('CONFIG_A=y\n')
+
+    a = CMakeApp('foo', 'esp32', sdkconfig_path='sdkconfig.defaults')
+    assert a.sdkconfig_files == [str(tmp_path / 'foo' / 'sdkconfig.defaults')]
+
+
+def test_app_reuse_work_dir(tmp_path):
+    (tmp_path / 'foo').mkdir()
+    (tmp_path / 'foo' / 'main.c').write_text('int main() {}')
+
+    a = CMakeApp('foo', 'esp32', work_dir='work', reuse_work_dir=True)
+    a._pre_build()
+    assert (tmp_path / 'work' / 'main.c').is_file()
+
+    (tmp_path / 'work' / 'generated').touch()
+    a._pre_build()
+    assert (tmp_path / 'work' / 'generated').is_file()
+
+    (tmp_path / 'foo' / 'main.c').write_text('int main() { return 0; }')
+    a._pre_build()
+    assert not (tmp_path / 'work' / 'generated').exists()
+    assert (tmp_path / 'work' / 'main.c').read_text() == 'int main() { return 0; }'
+
+
+@pytest.mark.parametrize(
+    'line, expected',
+    [
+        ('CONFIG_IDF_TARGET="esp32"\n', ('CONFIG_IDF_TARGET', 'esp32')),
+        ('TEST_COMPONENTS=foo bar\n', ('TEST_COMPONENTS', 'foo bar')),
+        ('CONFIG_EMPTY=\n', ('CONFIG_EMPTY', '')),
+        ('CONFIG_QUOTED="a"b"\n', None),
+        ('# CONFIG_FOO is not set\n', None),
+        ('=foo\n', None),
+        ('\n', None),
+    ],
+)
+def test_parse_sdkconfig_line(line, expected):
+    assert _parse_sdkconfig_line(line) == expected
+    m = App.SDKCONFIG_LINE_REGEX.match(line)
+    assert (m.groups() if m else None) == expected
+
+
+def test_app_hardlink_work_dir(tmp_path):
+    (tmp_path / 'foo').mkdir()
+    (tmp_path / 'foo' / 'main.c').write_text('int main() {}')
+
+    CMakeApp('foo', 'esp32', work_dir='work', hardlink_work_dir=True)._pre_build()
+    assert (tmp_path / 'work' / 'main.c').stat().st_ino == (tmp_path / 'foo' / 'main.c').stat().st_ino
+
+    CMakeApp('foo', 'esp32', work_dir='work2')._pre_build()
+    assert (tmp_path / 'work2' / 'main.c').stat().st_ino != (tmp_path / 'foo' / 'main.c').stat().st_ino
+
+
+def test_app_process_sdkconfig_files(tmp_path, monkeypatch):
+    (tmp_path / 'foo').mkdir()
+    (tmp_path / 'foo' / 'sdkconfig.defaults').write_text('CONFIG_A=y\n')
+
+    a = CMakeApp('foo', 'esp32')
+    assert a._process_sdkconfig_files() == ([os.path.join('foo', 'sdkconfig.defaults')], None)
+    assert not (tmp_path / 'foo' / 'expanded_sdkconfig_files').exists()
+
+    monkeypatch.setenv('FOO', 'bar')
+    (tmp_path / 'foo' / 'sdkconfig.defaults').write_text('CONFIG_A=${FOO}\nCONFIG_IDF_TARGET="esp32"\n')
+    expanded_fp = os.path.join('foo', 'expanded_sdkconfig_files', 'build', 'sdkconfig.defaults')
+    assert a._process_sdkconfig_files() == ([expanded_fp], 'esp32')
+    assert (tmp_path / expanded_fp).read_text() == 'CONFIG_A=bar\nCONFIG_IDF_TARGET="esp32"\n'
+
+    # the target-specific file is copied along with the expanded one
+    (tmp_path / 'foo' / 'sdkconfig.defaults.esp32').write_text('CONFIG_B=y\n')
+    a._process_sdkconfig_files()
+    assert (tmp_path / expanded_fp).with_name('sdkconfig.defaults.esp32').read_text() == 'CONFIG_B=y\n'
+
+
+def test_app_is_modified(tmp_path, monkeypatch):
+    a = CMakeApp('foo', 'esp32')
+    assert not a.is_modified(None)
+    assert not a.is_modified(['foo/README.md', 'bar/main.c'])
+    assert a.is_modified(['foo/README.md', 'foo/main.c'])
+    assert a.is_modified([str(tmp_path / 'foo' / 'main.c')])
+
+    # relative paths are resolved against the current directory
+    (tmp_path / 'bar').mkdir()
+    monkeypatch.chdir(tmp_path / 'bar')
+    assert not a.is_modified([str(tmp_path / 'foo' / 'main.c')])
+    assert a.is_modified([str(tmp_path / 'bar' / 'foo' / 'main.c')])
+
+
+def test_app_logger(caplog):
+    a = CMakeApp('foo', 'esp32')
+    b = CMakeApp('foo', 'esp32')
+    assert a == b
+
+    # equal apps share the module logger, but not the build stage
+    assert a._logger.logger is b._logger.logger
+    assert not a._logger.logger.filters
+
+    a._build_stage = BuildStage.PRE_BUILD
+    with caplog.at_level(logging.INFO, logger='idf_build_apps'):
+        a._logger.info('a')
+        b._logger.info('b')
+    assert [getattr(record, 'build_stage', None) for record in caplog.records] == [BuildStage.PRE_BUILD.value, None]
@@ -1,6 +1,7 @@
 # SPDX-FileCopyrightText: 2024-2025 Espressif Systems (Shanghai) CO LTD
 # SPDX-License-Identifier: Apache-2.0
 import os
+import re
 from tempfile import NamedTemporaryFile
 from xml.etree import ElementTree
 
@@ -18,6 +19,7 @@ from idf_build_apps.args import (
 )
 from idf_build_apps.constants import IDF_BUILD_APPS_TOML_FN
 from idf_build_apps.main import main
+from idf_build_apps.manifest.manifest import FolderRule
 
 
 def test_init_attr_deprecated_by():
@@ -94,6 +96,43 @@ def test_empty_argument():
     assert args.config_rules is None
 
 
+def test_default_build_targets(monkeypatch):
+    # the available targets depend on the ESP-IDF in use
+    all_targets = ['esp32', 'esp32s2', 'esp32c3']
+    monkeypatch.setattr('idf_build_apps.args.ALL_TARGETS', all_targets)
+    monkeypatch.setattr('idf_build_apps.args.ALL_TARGETS_SET', frozenset(all_targets))
+    monkeypatch.setattr(FolderRule, 'DEFAULT_BUILD_TARGETS', FolderRule.DEFAULT_BUILD_TARGETS)
+
+    args = FindArguments(default_build_targets=['esp32s2', 'foo', 'esp32', 'esp32s2'])
+    assert args.default_build_targets == ['esp32s2', 'esp32']
+    assert FolderRule.DEFAULT_BUILD_TARGETS == ['esp32s2', 'esp32']
+
+
+def test_dependency_driven_build_enabled_checked_once(monkeypatch):
+    checked = []
+    _check = DependencyDrivenBuildArguments._check_dependency_driven_build_enabled
+    monkeypatch.setattr(
+        DependencyDrivenBuildArguments,
+        '_check_dependency_driven_build_enabled',
+        lambda self: checked.append(1) or _check(self),
+    )
+
+    args = DependencyDrivenBuildArguments(
+        modified_components=['foo'], deactivate_dependency_driven_build_by_components=['foo']
+    )
+    assert not args.dependency_driven_build_enabled
+    assert not args.dependency_driven_build_enabled
+    assert len(checked) == 1
+
+    # checked again after the related fields are reassigned
+    args.modified_components = ['bar']
+    assert args.dependency_driven_build_enabled
+    assert len(checked) == 2
+
+    args.modified_components = None
+    assert not args.dependency_driven_build_enabled
+
+
 def test_build_args_expansion():
     args = BuildArguments(
         parallel_index=2, collect_app_info='@p.txt', junitxml='x_@p.txt', collect_size_info='@p_@p.txt'
@@ -225,6 +264,12 @@ class TestIgnoreWarningFile:
         assert App.IGNORE_WARNS_REGEXES[0].pattern == 'warning:xxx'
         assert App.IGNORE_WARNS_REGEXES[1].pattern == 'warning:yyy'
 
+    def test_not_exist(self):
+        with pytest.raises(SystemExit, match=re.escape('Ignore warning file foo.txt does not exist')):
+            BuildArguments(
+                ignore_warning_files=['foo.txt'],
+            )
+
     def test_ignore_extra_fields(self):
         with open(IDF_BUILD_APPS_TOML_FN, 'w') as fw:
             fw.write("""dry_run = true""")
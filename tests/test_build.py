@@ -20,12 +20,17 @@ from idf_build_apps import (
     find_apps,
 )
 from idf_build_apps.app import (
+    App,
     CMakeApp,
 )
 from idf_build_apps.constants import (
     IDF_PATH,
     BuildStatus,
 )
+from idf_build_apps.utils import (
+    BuildError,
+    InvalidCommand,
+)
 
 
 @pytest.mark.skipif(not shutil.which('idf.py'), reason='idf.py not found')
@@ -202,3 +207,56 @@ class TestBuild:
         assert test_suite.attrib['skipped'] == '0'
 
         assert test_suite.findall('testcase')[0].attrib['name'] == 'foo/bar/build'
+
+
+class _FakeApp(App):
+    def _build(self, **kwargs) -> None:
+        super()._build(**kwargs)
+
+        with open(self.build_log_path, 'w') as fw:
+            fw.write(f'building {self.app_dir}\n')
+
+        if self.app_dir.startswith('fail'):
+            raise BuildError('fake build failure')
+
+        self.build_status = BuildStatus.SUCCESS
+
+
+@pytest.mark.parametrize('jobs', [1, 3])
+def test_build_apps_in_parallel(tmp_path, jobs):
+    apps = [_FakeApp(f'{name}{i}', 'esp32') for i in range(3) for name in ('fail', 'pass')]
+
+    assert build_apps(apps, jobs=jobs, keep_going=True, junitxml=str(tmp_path / 'junit.xml')) == 1
+    assert [app.build_status for app in apps] == [BuildStatus.FAILED, BuildStatus.SUCCESS] * 3
+    assert [app.index for app in apps] == [1, 2, 3, 4, 5, 6]
+
+    test_suite = ElementTree.parse(tmp_path / 'junit.xml').getroot()[0]
+    assert [test_case.get('name') for test_case in test_suite.findall('testcase')] == [
+        f'{name}{i}/build' for i in range(3) for name in ('fail', 'pass')
+    ]
+
+
+@pytest.mark.parametrize(
+    'kwargs',
+    [
+        {},
+        # separated build directories still share the work directory
+        {'build_dir': 'build_@t'},
+        {'work_dir': 'work', 'build_dir': 'build_@t'},
+    ],
+)
+def test_build_apps_in_parallel_shared_work_dir(tmp_path, kwargs):
+    if 'work_dir' in kwargs:
+        kwargs['work_dir'] = str(tmp_path / kwargs['work_dir'])
+    apps = [CMakeApp(str(tmp_path / 'foo'), target, **kwargs) for target in ('esp32', 'esp32s2')]
+
+    with pytest.raises(InvalidCommand, match=r'target esp32, .+ and .+ target esp32s2, .+ share the same'):
+        build_apps(apps, jobs=2, dry_run=True)
+    assert [app.build_status for app in apps] == [BuildStatus.UNKNOWN] * 2
+
+
+def test_build_apps_in_parallel_separated_work_dir(tmp_path):
+    apps = [
+        CMakeApp(str(tmp_path / 'foo'), target, work_dir=str(tmp_path / 'work_@t')) for target in ('esp32', 'esp32s2')
+    ]
+    assert build_apps(apps, jobs=2, dry_run=True) == 0
@@ -6,7 +6,7 @@ from pathlib import Path
 
 import pytest
 
-from idf_build_apps.main import main
+from idf_build_apps.main import get_parser, main
 from idf_build_apps.utils import InvalidCommand
 
 
@@ -95,3 +95,24 @@ bar:
     assert f'Loading manifest file {os.path.join(tmp_path, "manifest.yml")}' in err
     assert f'"{os.path.join(tmp_path, "foo")}" does not exist' in err
     assert f'"{os.path.join(tmp_path, "bar")}" does not exist' in err
+
+
+def test_get_parser_with_action():
+    # the options of the other sub-commands are not registered
+    args = get_parser('find').parse_args(['find', '--recursive'])
+    assert args.recursive is True
+
+    with pytest.raises(SystemExit):
+        get_parser('find').parse_args(['build', '--recursive'])
+
+    args = get_parser().parse_args(['build', '--recursive'])
+    assert args.recursive is True
+
+    with pytest.raises(SystemExit):
+        get_parser('').parse_args(['find', '--recursive'])
+
+
+def test_get_parser_multiple_times():
+    for _ in range(2):
+        args = get_parser('find').parse_args(['find', '-ic', 'foo;bar'])
+        assert args.ignore_app_dependencies_components == ['foo', 'bar']
@@ -13,6 +13,7 @@ from idf_build_apps.constants import (
 from idf_build_apps.manifest.manifest import (
     IfClause,
     Manifest,
+    _cache_size_from_env,
 )
 from idf_build_apps.utils import (
     InvalidIfClause,
@@ -544,3 +545,77 @@ class TestIfParser:
     def test_temporary_must_with_reason(self):
         with pytest.raises(InvalidIfClause, match='"reason" must be set when "temporary: true"'):
             IfClause(stmt='IDF_TARGET == "esp32"', temporary=True)
+
+
+def test_manifest_from_file_cache(tmp_path, monkeypatch):
+    yaml_file = tmp_path / 'test.yml'
+    yaml_file.write_text(
+        """
+test1:
+    enable:
+        - if: TEST_ENV_VAR == "1"
+""",
+        encoding='utf8',
+    )
+
+    monkeypatch.setenv('TEST_ENV_VAR', '0')
+    manifest = Manifest.from_file(yaml_file, root_path=tmp_path)
+    assert manifest.rules[0].enable[0].get_value('esp32', 'default') is False
+
+    # the parsed file is cached, but the if clauses are evaluated again
+    monkeypatch.setenv('TEST_ENV_VAR', '1')
+    new_manifest = Manifest.from_file(yaml_file, root_path=tmp_path)
+    assert new_manifest.rules[0] is not manifest.rules[0]
+    assert new_manifest.rules[0].enable[0].get_value('esp32', 'default') is True
+
+    # different root path
+    assert Manifest.from_file(yaml_file, root_path=tmp_path / 'foo').rules[0].folder == str(tmp_path / 'foo' / 'test1')
+
+    yaml_file.write_text(
+        """
+test1:
+    enable:
+        - if: TEST_ENV_VAR == "2"
+""",
+        encoding='utf8',
+    )
+    # the mtime may not change when written in the same clock tick
+    mtime_ns = yaml_file.stat().st_mtime_ns + 1_000_000_000
+    os.utime(yaml_file, ns=(mtime_ns, mtime_ns))
+    assert Manifest.from_file(yaml_file, root_path=tmp_path).rules[0].sha != manifest.rules[0].sha
+
+
+def test_manifest_cache_size_from_env(monkeypatch, caplog):
+    monkeypatch.delenv('IDF_BUILD_APPS_MANIFEST_CACHE_SIZE', raising=False)
+    assert _cache_size_from_env() == 64
+
+    monkeypatch.setenv('IDF_BUILD_APPS_MANIFEST_CACHE_SIZE', '0')
+    assert _cache_size_from_env() == 0
+
+    monkeypatch.setenv('IDF_BUILD_APPS_MANIFEST_CACHE_SIZE', 'foo')
+    assert _cache_size_from_env() == 64
+    assert 'Invalid IDF_BUILD_APPS_MANIFEST_CACHE_SIZE "foo"' in caplog.text
+
+
+def test_manifest_most_suitable_rule(tmp_path):
+    yaml_file = tmp_path / 'test.yml'
+    yaml_file.write_text(
+        """
+test1:
+    enable:
+        - if: IDF_TARGET == "esp32"
+test1/sub:
+    enable:
+        - if: IDF_TARGET == "esp32s2"
+""",
+        encoding='utf8',
+    )
+
+    manifest = Manifest.from_file(yaml_file, root_path=tmp_path)
+    assert manifest.most_suitable_rule(str(tmp_path / 'test1' / 'foo')).folder == str(tmp_path / 'test1')
+    assert manifest.most_suitable_rule(str(tmp_path / 'test1' / 'sub' / 'foo')).folder == str(
+        tmp_path / 'test1' / 'sub'
+    )
+    assert manifest.most_suitable_rule(str(tmp_path / 'test2')).folder == str(tmp_path / 'test2')
+    # looked up once
+    assert manifest.most_suitable_rule(str(tmp_path / 'test2')) is manifest.most_suitable_rule(str(tmp_path / 'test2'))
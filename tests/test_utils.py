@@ -1,6 +1,8 @@
 # SPDX-FileCopyrightText: 2022-2025 Espressif Systems (Shanghai) CO LTD
 # SPDX-License-Identifier: Apache-2.0
+import io
 import os
+import sys
 from pathlib import (
     Path,
 )
@@ -8,9 +10,12 @@ from pathlib import (
 import pytest
 
 from idf_build_apps.utils import (
+    BuildError,
+    file_contains,
     files_matches_patterns,
     get_parallel_start_stop,
     rmdir,
+    subprocess_run,
     to_absolute_path,
 )
 
@@ -142,3 +147,56 @@ def test_files_matches_patterns(tmp_path):
         os.chdir(temp_dir)
         for f in matched_files:
             assert files_matches_patterns(f, abs_pat)
+
+
+def test_file_contains(tmp_path):
+    assert not file_contains(str(tmp_path / 'not_exist'), b'foo')
+
+    (tmp_path / 'empty').touch()
+    assert not file_contains(str(tmp_path / 'empty'), b'foo')
+
+    (tmp_path / 'test').write_text('bar\nfoo\nbaz\n')
+    assert file_contains(str(tmp_path / 'test'), b'foo')
+    assert not file_contains(str(tmp_path / 'test'), b'foo\nbar')
+
+    # modified
+    (tmp_path / 'test').write_text('bar\nbaz\n')
+    assert not file_contains(str(tmp_path / 'test'), b'foo')
+
+    (tmp_path / 'link').symlink_to(tmp_path / 'test')
+    assert file_contains(str(tmp_path / 'link'), b'baz')
+    assert not file_contains(str(tmp_path), b'foo')
+
+
+def test_subprocess_run_log_fs(tmp_path):
+    cmd = [sys.executable, '-c', 'print("foo")']
+
+    log_file = tmp_path / 'log'
+    with open(log_file, 'a') as fa:
+        fa.write('start\n')
+        subprocess_run(cmd, log_terminal=False, log_fs=fa)
+        fa.write('end\n')
+    assert log_file.read_text().splitlines() == ['start', 'foo', 'end']
+
+    assert subprocess_run(cmd, log_terminal=False, log_fs=io.StringIO()) == 0
+
+    with pytest.raises(BuildError):
+        subprocess_run([sys.executable, '-c', 'exit(1)'], log_terminal=False, log_fs=str(log_file), check=True)
+
+
+def test_subprocess_run_additional_env(tmp_path):
+    log_file = str(tmp_path / 'log')
+    subprocess_run(
+        [sys.executable, '-c', 'import os; print(os.getenv("IDF_BUILD_APPS_TEST_ENV"))'],
+        log_terminal=False,
+        log_fs=log_file,
+        additional_env_dict={'IDF_BUILD_APPS_TEST_ENV': 'foo'},
+    )
+    subprocess_run(
+        [sys.executable, '-c', 'import os; print(os.getenv("IDF_BUILD_APPS_TEST_ENV"))'],
+        log_terminal=False,
+        log_fs=log_file,
+    )
+
+    # not leaked into the environment of the current process
+    assert Path(log_file).read_text().splitlines() == ['foo', 'None']